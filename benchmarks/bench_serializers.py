@@ -0,0 +1,56 @@
+"""Compare serializer backend throughput.
+
+Usage: python benchmarks/bench_serializers.py [url_count]
+"""
+
+import sys
+import time
+
+from sitemapy import HreflangCluster, ImageEntry, Sitemap, URLEntry
+from sitemapy.serializers import SERIALIZERS, get_serializer
+
+
+def build_sitemap(url_count: int) -> Sitemap:
+    sitemap = Sitemap()
+    cluster = HreflangCluster.from_dict(
+        {lang: f"https://www.example.com/{lang}/" for lang in ("en", "de", "fr")}
+    )
+    for i in range(url_count):
+        entry = URLEntry(
+            f"https://www.example.com/p/{i}/?ref=a&b={i}",
+            lastmod="2024-01-01",
+            changefreq="weekly",
+            priority=0.5,
+        )
+        if i % 4 == 0:
+            entry.add_image(ImageEntry(f"https://www.example.com/img/{i}.png"))
+        if i % 10 == 0:
+            entry.set_hreflang_cluster(cluster)
+        sitemap.urls.append(entry)
+
+    return sitemap
+
+
+def main(url_count: int = 100_000):
+    sitemap = build_sitemap(url_count)
+    print(f"{url_count:,} URLs")
+
+    for name in SERIALIZERS:
+        try:
+            get_serializer(name)
+        except ImportError as e:
+            print(f"{name:>10}: skipped ({e})")
+            continue
+
+        sitemap.serializer = name
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in sitemap.iter_chunks())
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>10}: {elapsed:6.2f}s  {url_count / elapsed:>10,.0f} URLs/s"
+            f"  {size / elapsed / 1e6:6.1f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -3,25 +3,51 @@ from .sitemapy import (
     Sitemap,
     URLEntry,
     HreflangAlternate,
+    HreflangCluster,
     SitemapIndex,
     IndexEntry,
+    SitemapWriter,
+    ShardedSitemapWriter,
     ImageEntry,
     NewsEntry,
     SITEMAP_NS,
     IMAGE_NS,
     NEWS_NS,
+    XHTML_NS,
 )
+from .normalize import URLNormalizer, TRACKING_PARAMS
+from .bloom import BloomFilter
+from .server import SitemapApp
+from .serializers import SitemapSerializer, get_serializer
+from .sorting import sort_entries
+from .news import NewsSitemap
+from .builder import ConcurrentSitemapBuilder
+from .publish import AtomicShardedSitemapWriter
 
 __all__ = [
     "Sitemap",
     "URLEntry",
     "HreflangAlternate",
+    "HreflangCluster",
     "SitemapIndex",
     "IndexEntry",
+    "SitemapWriter",
+    "ShardedSitemapWriter",
     "ImageEntry",
     "NewsEntry",
     "SITEMAP_NS",
     "IMAGE_NS",
     "NEWS_NS",
+    "XHTML_NS",
+    "URLNormalizer",
+    "TRACKING_PARAMS",
+    "BloomFilter",
+    "SitemapApp",
+    "SitemapSerializer",
+    "get_serializer",
+    "sort_entries",
+    "NewsSitemap",
+    "ConcurrentSitemapBuilder",
+    "AtomicShardedSitemapWriter",
 ]
 __version__ = "0.2.4"
@@ -0,0 +1,243 @@
+import hashlib
+import math
+import mmap
+from pathlib import Path
+import struct
+from typing import Iterable, Iterator
+
+from .normalize import URLNormalizer
+from .sitemapy import Sitemap, URLEntry, _atomic_open
+
+# magic, format version, hash count, bit count, item count
+_HEADER = struct.Struct("<4sBBQQ")
+_MAGIC = b"SMBF"
+_VERSION = 1
+
+
+class BloomFilter:
+    """Compact probabilistic set of URLs for deduplicating across sitemap sets.
+
+    Membership checks never give false negatives. False positives (a new URL
+    reported as already seen) happen at roughly ``error_rate`` once
+    ``capacity`` URLs have been added.
+
+    Args:
+        capacity (int): expected number of URLs
+        error_rate (float): target false positive rate. Default = 0.001
+        normalizer (URLNormalizer) [Optional]: normalize locs before hashing
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = 0.001,
+        normalizer: URLNormalizer | None = None,
+    ):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive. received: {capacity}")
+        if not 0 < error_rate < 1:
+            raise ValueError(
+                f"error_rate must be between 0 and 1. received: {error_rate}"
+            )
+
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+
+        self.normalizer = normalizer
+        self._init_bits(num_bits, num_hashes, bytearray((num_bits + 7) // 8), 0)
+
+    def _init_bits(self, num_bits: int, num_hashes: int, bits, count: int):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self._bits = bits
+        self._mmap = None
+
+    @classmethod
+    def from_files(
+        cls,
+        paths: Iterable[str | Path],
+        capacity: int,
+        error_rate: float = 0.001,
+        normalizer: URLNormalizer | None = None,
+    ) -> "BloomFilter":
+        """
+        Builds filter from sitemap or sitemap index files on disk. Index files are
+        followed to the sitemaps they list, and URLs are streamed without loading
+        whole sitemaps into memory.
+
+        Args:
+            paths (list): filepaths to sitemap (.xml or .xml.gz) or sitemap index files
+            capacity (int): expected number of URLs
+            error_rate (float): target false positive rate. Default = 0.001
+            normalizer (URLNormalizer) [Optional]: normalize locs before hashing
+
+        Returns:
+            BloomFilter: instance of BloomFilter
+        """
+        instance = cls(capacity=capacity, error_rate=error_rate, normalizer=normalizer)
+        for path in paths:
+            instance.update(Sitemap.iter_tree(path))
+
+        return instance
+
+    @classmethod
+    def from_sitemaps(
+        cls,
+        sitemaps: Iterable[Sitemap],
+        capacity: int | None = None,
+        error_rate: float = 0.001,
+        normalizer: URLNormalizer | None = None,
+    ) -> "BloomFilter":
+        """Builds filter from in-memory Sitemap objects"""
+        sitemaps = list(sitemaps)
+        if capacity is None:
+            capacity = max(1, sum(len(s) for s in sitemaps))
+
+        instance = cls(capacity=capacity, error_rate=error_rate, normalizer=normalizer)
+        for sitemap in sitemaps:
+            instance.update(sitemap)
+
+        return instance
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        use_mmap: bool = True,
+        normalizer: URLNormalizer | None = None,
+    ) -> "BloomFilter":
+        """
+        Load a filter saved with save(). By default the bit array is memory-mapped
+        copy-on-write, so loading is instant and adds never touch the file.
+
+        Args:
+            path (str or Path): the filepath to the saved filter
+            use_mmap (bool): memory-map the bit array instead of reading it. Default = True
+            normalizer (URLNormalizer) [Optional]: must match the one used to build it
+
+        Returns:
+            BloomFilter: instance of BloomFilter
+        """
+        instance = cls.__new__(cls)
+        instance.normalizer = normalizer
+
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"Not a sitemapy bloom filter file: {path}")
+            magic, version, num_hashes, num_bits, count = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError(f"Not a sitemapy bloom filter file: {path}")
+            if version != _VERSION:
+                raise ValueError(f"Unsupported bloom filter version: {version}")
+
+            num_bytes = (num_bits + 7) // 8
+            if use_mmap:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+                if len(mapped) < _HEADER.size + num_bytes:
+                    mapped.close()
+                    raise ValueError(f"Truncated bloom filter file: {path}")
+                bits = memoryview(mapped)[_HEADER.size : _HEADER.size + num_bytes]
+            else:
+                bits = bytearray(f.read(num_bytes))
+                if len(bits) < num_bytes:
+                    raise ValueError(f"Truncated bloom filter file: {path}")
+                mapped = None
+
+        instance._init_bits(num_bits, num_hashes, bits, count)
+        instance._mmap = mapped
+
+        return instance
+
+    def save(self, path: str | Path) -> "BloomFilter":
+        """Write filter to disk for later load(), also over the file it was loaded from"""
+        with _atomic_open(path) as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC, _VERSION, self.num_hashes, self.num_bits, self.count
+                )
+            )
+            f.write(self._bits)
+
+        return self
+
+    def close(self):
+        """Release the memory map of a loaded filter"""
+        if self._mmap is not None:
+            self._bits.release()
+            self._mmap.close()
+            self._mmap = None
+            self._bits = None
+
+    def add(self, url: str | URLEntry) -> bool:
+        """Add URL to filter. Returns True if it was (probably) already present"""
+        bits = self._bits
+        present = True
+        for index in self._indexes(url):
+            byte, mask = index >> 3, 1 << (index & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+
+        if not present:
+            self.count += 1
+
+        return present
+
+    def update(self, urls: Iterable[str | URLEntry]) -> "BloomFilter":
+        """
+        Add every URL from an iterable or Sitemap. A SitemapIndex would add its
+        shard URLs, use from_files() to add the pages of an index tree.
+        """
+        for url in urls:
+            self.add(url)
+
+        return self
+
+    def filter_new(self, urls: Iterable[str | URLEntry]) -> Iterator[str | URLEntry]:
+        """
+        Yield only URLs not already in the filter, adding each as it passes.
+        Use it to stream new URLs into a writer while skipping known ones.
+        """
+        add = self.add
+        for url in urls:
+            if not add(url):
+                yield url
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """Current false positive probability for the number of URLs added"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** (
+            self.num_hashes
+        )
+
+    def _indexes(self, url: str | URLEntry) -> Iterator[int]:
+        """Bit positions for a URL using double hashing on one 128-bit digest"""
+        if not isinstance(url, str):
+            url = url.loc
+        if self.normalizer is not None:
+            url = self.normalizer.normalize(url)
+
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % num_bits
+
+    def __contains__(self, url: str | URLEntry) -> bool:
+        bits = self._bits
+        for index in self._indexes(url):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
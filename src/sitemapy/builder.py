@@ -0,0 +1,186 @@
+import threading
+from typing import Iterable
+
+from .normalize import URLNormalizer, _DigestSet, url_digest
+from .sitemapy import ShardedSitemapWriter, Sitemap, SitemapWriter, URLEntry
+
+DEFAULT_BATCH_SIZE = 1_024
+DEFAULT_DEDUP_SHARDS = 64
+
+
+class _ShardedDigestSet:
+    """Set of URL digests split across independently locked shards"""
+
+    def __init__(self, shard_count: int):
+        self._shards = [_DigestSet() for _ in range(shard_count)]
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+
+    def filter_new(self, digests: list[int]) -> list[bool]:
+        """Add digests, returning whether each one was new. One lock per shard hit"""
+        shard_count = len(self._shards)
+        by_shard: dict[int, list[int]] = {}
+        for i, digest in enumerate(digests):
+            # High bits pick the shard, the low bits index slots within it
+            by_shard.setdefault((digest >> 32) % shard_count, []).append(i)
+
+        new = [False] * len(digests)
+        for shard, indexes in by_shard.items():
+            seen = self._shards[shard]
+            with self._locks[shard]:
+                for i in indexes:
+                    new[i] = seen.add(digests[i])
+
+        return new
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+
+class _LocalBuffer:
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries: list[URLEntry] = []
+
+
+class ConcurrentSitemapBuilder:
+    """Collects URLs from many producer threads and hands them to a writer in batches.
+
+    Each thread appends to its own buffer without locking. Full buffers are
+    deduplicated against a set sharded by URL digest, so threads rarely
+    contend for the same lock, then written to the sink under a single lock
+    per batch. The order of URLs within a thread is kept; batches from
+    different threads are interleaved.
+
+    Call close() (or leave the with block) once every producer has finished,
+    to write what is left in their buffers.
+
+    Args:
+        sink (SitemapWriter, ShardedSitemapWriter or Sitemap) [Optional]: receives the
+            batches. Default = a new Sitemap, available as builder.sink
+        batch_size (int): URLs buffered per thread before a batch is written. Default = 1,024
+        dedup (bool): drop URLs whose loc was already added. Default = False
+        normalizer (URLNormalizer) [Optional]: normalize locs before comparing, implies dedup
+        dedup_shards (int): number of independently locked dedup sets. Default = 64
+    """
+
+    def __init__(
+        self,
+        sink: SitemapWriter | ShardedSitemapWriter | Sitemap | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dedup: bool = False,
+        normalizer: URLNormalizer | None = None,
+        dedup_shards: int = DEFAULT_DEDUP_SHARDS,
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive. received: {batch_size}")
+        if dedup_shards <= 0:
+            raise ValueError(f"dedup_shards must be positive. received: {dedup_shards}")
+
+        self.sink = Sitemap() if sink is None else sink
+        self.batch_size = batch_size
+        self.normalizer = normalizer
+        self.url_count = 0
+        self.duplicate_count = 0
+
+        if isinstance(self.sink, Sitemap):
+            self._write_batch = self.sink.urls.extend
+        else:
+            self._write_batch = self.sink.write_many
+
+        dedup = dedup or normalizer is not None
+        self._seen = _ShardedDigestSet(dedup_shards) if dedup else None
+        self._local = threading.local()
+        self._buffers: list[_LocalBuffer] = []
+        self._buffers_lock = threading.Lock()
+        self._sink_lock = threading.Lock()
+        self._closed = False
+
+    def add_url(self, url: str | URLEntry, **kwargs) -> "ConcurrentSitemapBuilder":
+        """
+        Add a URL from the calling thread.
+
+        Args:
+            url (str or URLEntry): the URL to add
+            **kwargs: URLEntry fields (lastmod, changefreq, priority) for string URLs
+
+        Returns:
+            ConcurrentSitemapBuilder: the instance, for chaining
+        """
+        if isinstance(url, str):
+            url = URLEntry(loc=url, **kwargs)
+
+        entries = self._buffer().entries
+        entries.append(url)
+        if len(entries) >= self.batch_size:
+            self.flush()
+
+        return self
+
+    def add_many(self, urls: Iterable[str | URLEntry]) -> "ConcurrentSitemapBuilder":
+        """Add every URL from an iterable, from the calling thread"""
+        for url in urls:
+            self.add_url(url)
+
+        return self
+
+    def flush(self) -> "ConcurrentSitemapBuilder":
+        """Write the calling thread's buffer"""
+        self._flush_buffer(self._buffer())
+
+        return self
+
+    def close(self):
+        """Write every thread's remaining buffer. Returns the sink"""
+        with self._buffers_lock:
+            self._closed = True
+            buffers = list(self._buffers)
+
+        for buffer in buffers:
+            self._flush_buffer(buffer)
+
+        return self.sink
+
+    def _buffer(self) -> _LocalBuffer:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = _LocalBuffer()
+            with self._buffers_lock:
+                if self._closed:
+                    raise ValueError("URL added to a closed ConcurrentSitemapBuilder")
+                self._buffers.append(buffer)
+        elif self._closed:
+            raise ValueError("URL added to a closed ConcurrentSitemapBuilder")
+
+        return buffer
+
+    def _flush_buffer(self, buffer: _LocalBuffer):
+        batch, buffer.entries = buffer.entries, []
+        if not batch:
+            return
+
+        duplicates = 0
+        if self._seen is not None:
+            # Hash outside any lock, then filter against the sharded set
+            normalize = self.normalizer.normalize if self.normalizer else None
+            digests = [
+                url_digest(u.loc if normalize is None else normalize(u.loc))
+                for u in batch
+            ]
+            new = self._seen.filter_new(digests)
+            unique = [u for u, is_new in zip(batch, new) if is_new]
+            duplicates = len(batch) - len(unique)
+            batch = unique
+
+        with self._sink_lock:
+            if batch:
+                self._write_batch(batch)
+            self.url_count += len(batch)
+            self.duplicate_count += duplicates
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
@@ -0,0 +1,484 @@
+import argparse
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+import re
+import shutil
+import sys
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit
+
+from defusedxml import ElementTree as DefusedElementTree
+
+from .normalize import URLNormalizer, _DigestSet, url_digest
+from .publish import AtomicShardedSitemapWriter
+from .sorting import SORT_KEYS, sort_entries
+from .sitemapy import (
+    DEFAULT_COMPRESS_LEVEL,
+    MAX_SITEMAP_BYTES,
+    MAX_URLS_PER_SITEMAP,
+    NewsEntry,
+    ShardedSitemapWriter,
+    Sitemap,
+    SitemapIndex,
+    SitemapWriter,
+    URLEntry,
+    _is_index_file,
+    _open_xml,
+)
+
+CHANGEFREQ_VALUES = frozenset(
+    ("always", "hourly", "daily", "weekly", "monthly", "yearly", "never")
+)
+# Fields accepted under "news" in JSONL records
+NEWS_FIELDS = ("publication_name", "publication_language", "publication_date", "title")
+
+# W3C Datetime: YYYY, YYYY-MM, YYYY-MM-DD or a full timestamp with timezone
+_W3C_DATETIME = re.compile(
+    r"^\d{4}(-\d{2}(-\d{2}(T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:\d{2}))?)?)?$"
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for the sitemapy console script"""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, DefusedElementTree.ParseError) as e:
+        print(f"sitemapy: error: {e}", file=sys.stderr)
+        return 2
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sitemapy",
+        description="Build, shard, merge, diff, validate and convert XML sitemaps",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    output_options = argparse.ArgumentParser(add_help=False)
+    output_options.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="output file (.xml or .xml.gz), or output directory with --base-url",
+    )
+    output_options.add_argument(
+        "--base-url",
+        help="shard the output into a directory, using this URL for index entries",
+    )
+    output_options.add_argument(
+        "--prefix", default="sitemap", help="shard filename prefix (default: sitemap)"
+    )
+    output_options.add_argument(
+        "--max-urls",
+        type=int,
+        default=MAX_URLS_PER_SITEMAP,
+        help=f"URLs per shard (default: {MAX_URLS_PER_SITEMAP})",
+    )
+    output_options.add_argument(
+        "--no-compress", action="store_true", help="write shards as plain .xml"
+    )
+    output_options.add_argument(
+        "--compress-level",
+        type=int,
+        default=DEFAULT_COMPRESS_LEVEL,
+        choices=range(1, 10),
+        metavar="{1-9}",
+        help=f"gzip compression level (default: {DEFAULT_COMPRESS_LEVEL})",
+    )
+    output_options.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes used to write shards (default: 1)",
+    )
+    output_options.add_argument(
+        "--atomic",
+        action="store_true",
+        help="with --base-url, write shards to a staging directory and swap the "
+        "output directory (a symlink) to it once every file is on disk",
+    )
+    output_options.add_argument(
+        "--sort",
+        choices=tuple(SORT_KEYS),
+        help="order URLs by this field, spilling to temporary files when large",
+    )
+    output_options.add_argument(
+        "--reverse", action="store_true", help="sort in descending order"
+    )
+
+    dedup_options = argparse.ArgumentParser(add_help=False)
+    dedup_options.add_argument(
+        "--dedup", action="store_true", help="drop URLs with a duplicate loc"
+    )
+    dedup_options.add_argument(
+        "--normalize",
+        action="store_true",
+        help="compare normalized URLs when deduplicating or diffing",
+    )
+
+    build = subparsers.add_parser(
+        "build",
+        parents=[output_options, dedup_options],
+        help="build sitemaps from CSV or JSONL records",
+    )
+    build.add_argument("inputs", nargs="+", help="CSV or JSONL files, '-' reads stdin")
+    build.add_argument(
+        "--format",
+        choices=("csv", "jsonl"),
+        help="input format (default: from file extension)",
+    )
+    build.set_defaults(handler=_cmd_build)
+
+    shard = subparsers.add_parser(
+        "shard",
+        parents=[output_options],
+        help="split an existing sitemap into shards plus an index",
+    )
+    shard.add_argument("inputs", nargs="+", help="sitemap or sitemap index files")
+    shard.set_defaults(handler=_cmd_shard)
+
+    merge = subparsers.add_parser(
+        "merge",
+        parents=[output_options, dedup_options],
+        help="merge existing sitemaps into one sitemap or shard set",
+    )
+    merge.add_argument("inputs", nargs="+", help="sitemap or sitemap index files")
+    merge.set_defaults(handler=_cmd_merge)
+
+    diff = subparsers.add_parser(
+        "diff",
+        help="list URLs added (+) and removed (-) between two sitemaps, sorted by URL",
+    )
+    diff.add_argument("old", help="sitemap or sitemap index file")
+    diff.add_argument("new", help="sitemap or sitemap index file")
+    diff.add_argument(
+        "--normalize", action="store_true", help="compare normalized URLs"
+    )
+    diff.set_defaults(handler=_cmd_diff)
+
+    validate = subparsers.add_parser(
+        "validate", help="check sitemaps against the sitemap protocol"
+    )
+    validate.add_argument("inputs", nargs="+", help="sitemap or sitemap index files")
+    validate.set_defaults(handler=_cmd_validate)
+
+    convert = subparsers.add_parser(
+        "convert", help="compress or decompress a sitemap based on file extensions"
+    )
+    convert.add_argument("input", help="input file (.xml or .xml.gz)")
+    convert.add_argument("output", help="output file (.xml or .xml.gz)")
+    convert.add_argument(
+        "--compress-level",
+        type=int,
+        default=DEFAULT_COMPRESS_LEVEL,
+        choices=range(1, 10),
+        metavar="{1-9}",
+        help=f"gzip compression level (default: {DEFAULT_COMPRESS_LEVEL})",
+    )
+    convert.set_defaults(handler=_cmd_convert)
+
+    return parser
+
+
+def _cmd_build(args) -> int:
+    entries = (
+        _entry_from_record(record, location)
+        for path in args.inputs
+        for location, record in _iter_records(path, args.format)
+    )
+    _write_output(_dedup(entries, args), args)
+    return 0
+
+
+def _cmd_shard(args) -> int:
+    if not args.base_url:
+        raise ValueError("shard requires --base-url")
+
+    _write_output(_iter_inputs(args.inputs), args)
+    return 0
+
+
+def _cmd_merge(args) -> int:
+    _write_output(_dedup(_iter_inputs(args.inputs), args), args)
+    return 0
+
+
+def _cmd_diff(args) -> int:
+    normalize = URLNormalizer().normalize if args.normalize else None
+    old_locs = _sorted_locs(args.old, normalize)
+    new_locs = _sorted_locs(args.new, normalize)
+    changed = False
+
+    # Merge the two sorted streams, memory stays bounded by the external sort
+    old = next(old_locs, None)
+    new = next(new_locs, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old < new):
+            changed = True
+            print(f"- {old}")
+            old = next(old_locs, None)
+        elif old is None or new < old:
+            changed = True
+            print(f"+ {new}")
+            new = next(new_locs, None)
+        else:
+            old = next(old_locs, None)
+            new = next(new_locs, None)
+
+    return 1 if changed else 0
+
+
+def _sorted_locs(path: str, normalize) -> Iterator[str]:
+    """Distinct locs of a sitemap tree in sorted order"""
+    locs = (
+        u.loc if normalize is None else normalize(u.loc)
+        for u in Sitemap.iter_tree(path)
+    )
+    previous = None
+    for entry in sort_entries(locs):
+        if entry.loc != previous:
+            previous = entry.loc
+            yield previous
+
+
+def _cmd_validate(args) -> int:
+    failed = False
+    for path in args.inputs:
+        for problem in _iter_problems(Path(path)):
+            failed = True
+            print(problem)
+
+    return 1 if failed else 0
+
+
+def _cmd_convert(args) -> int:
+    output = Path(args.output)
+    with _open_xml(Path(args.input)) as src:
+        if output.suffix == ".gz":
+            dst = gzip.open(output, "wb", compresslevel=args.compress_level)
+        else:
+            dst = open(output, "wb")
+        with dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+    return 0
+
+
+def _write_output(entries: Iterable[URLEntry], args):
+    """Stream entries to a single sitemap file or a shard directory"""
+    if args.sort:
+        entries = sort_entries(entries, key=args.sort, reverse=args.reverse)
+
+    if args.base_url:
+        writer_class = (
+            AtomicShardedSitemapWriter if args.atomic else ShardedSitemapWriter
+        )
+        with writer_class(
+            args.output,
+            args.base_url,
+            prefix=args.prefix,
+            max_urls=args.max_urls,
+            compress=not args.no_compress,
+            compress_level=args.compress_level,
+            workers=args.workers,
+        ) as writer:
+            writer.write_many(entries)
+        print(
+            f"Wrote {writer.url_count} URLs to {writer.shard_count} sitemaps "
+            f"and {Path(args.output) / writer.index_filename}",
+            file=sys.stderr,
+        )
+        return
+
+    with SitemapWriter(args.output, compress_level=args.compress_level) as writer:
+        writer.write_many(entries)
+
+    if writer.url_count > MAX_URLS_PER_SITEMAP:
+        print(
+            f"Warning: {writer.url_count} URLs exceeds the {MAX_URLS_PER_SITEMAP} URL "
+            "limit per sitemap, use --base-url to shard",
+            file=sys.stderr,
+        )
+
+
+def _dedup(entries: Iterable[URLEntry], args) -> Iterator[URLEntry]:
+    """Drop repeated locs, tracking 64-bit digests in a compact table"""
+    if not args.dedup:
+        yield from entries
+        return
+
+    normalize = URLNormalizer().normalize if args.normalize else None
+    seen = _DigestSet()
+    for entry in entries:
+        key = url_digest(entry.loc if normalize is None else normalize(entry.loc))
+        if seen.add(key):
+            yield entry
+
+
+def _iter_inputs(paths: list[str]) -> Iterator[URLEntry]:
+    for path in paths:
+        yield from Sitemap.iter_tree(path)
+
+
+def _iter_records(path: str, input_format: str | None) -> Iterator[tuple[str, dict]]:
+    """Stream (path:line, record) pairs from a CSV (with header) or JSONL file"""
+    if input_format is None:
+        suffixes = Path(path).suffixes
+        if ".csv" in suffixes:
+            input_format = "csv"
+        elif ".jsonl" in suffixes or ".ndjson" in suffixes:
+            input_format = "jsonl"
+        else:
+            raise ValueError(f"Cannot tell format of {path}, use --format")
+
+    if path == "-":
+        f = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    elif path.endswith(".gz"):
+        f = gzip.open(path, "rt", encoding="utf-8", newline="")
+    else:
+        f = open(path, "r", encoding="utf-8", newline="")
+
+    with f:
+        if input_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield f"{path}:{reader.line_num}", record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+                if not isinstance(record, dict):
+                    raise ValueError(
+                        f"{path}:{line_number}: expected a JSON object, "
+                        f"received: {type(record).__name__}"
+                    )
+                yield f"{path}:{line_number}", record
+
+
+def _entry_from_record(record: dict, location: str) -> URLEntry:
+    """Build a URLEntry from a CSV row or JSON object read at location (path:line)"""
+    try:
+        return _build_entry(record)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"{location}: invalid record: {e}") from None
+
+
+def _build_entry(record: dict) -> URLEntry:
+    loc = record.get("loc")
+    if not loc:
+        raise ValueError("missing required field: loc")
+
+    priority = record.get("priority")
+    url_entry = URLEntry(
+        loc=loc,
+        lastmod=record.get("lastmod") or None,
+        changefreq=record.get("changefreq") or None,
+        priority=float(priority) if priority not in (None, "") else None,
+    )
+
+    # Extensions are only available in JSONL records
+    alternates = record.get("alternates")
+    if alternates:
+        url_entry.add_alternates(alternates)
+
+    for image in record.get("images") or ():
+        url_entry.add_image(image)
+
+    news = record.get("news")
+    if news:
+        if not isinstance(news, dict):
+            raise ValueError(f"news must be an object, received: {type(news).__name__}")
+        unknown = set(news) - set(NEWS_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"unknown news fields: {', '.join(sorted(unknown))}. "
+                f"Available: {', '.join(NEWS_FIELDS)}"
+            )
+        url_entry.add_news_entry(NewsEntry(**news))
+
+    return url_entry
+
+
+def _iter_problems(path: Path) -> Iterator[str]:
+    """Yield a message for every protocol violation in a sitemap or index file"""
+    try:
+        is_index = _is_index_file(path)
+    except DefusedElementTree.ParseError as e:
+        yield f"{path}: not well-formed XML: {e}"
+        return
+
+    size = _uncompressed_size(path)
+    if size > MAX_SITEMAP_BYTES:
+        yield f"{path}: {size} bytes uncompressed, limit is {MAX_SITEMAP_BYTES}"
+
+    if is_index:
+        yield from _iter_index_problems(path)
+        return
+
+    count = 0
+    try:
+        for url_entry in Sitemap.iter_file(path):
+            count += 1
+            for problem in _url_entry_problems(url_entry):
+                yield f"{path}: {url_entry.loc}: {problem}"
+    except (DefusedElementTree.ParseError, ValueError) as e:
+        yield f"{path}: invalid sitemap after {count} URLs: {e}"
+        return
+
+    if count > MAX_URLS_PER_SITEMAP:
+        yield f"{path}: {count} URLs, limit is {MAX_URLS_PER_SITEMAP}"
+
+
+def _iter_index_problems(path: Path) -> Iterator[str]:
+    index = SitemapIndex.from_file(path)
+    if len(index) > MAX_URLS_PER_SITEMAP:
+        yield f"{path}: {len(index)} sitemaps, limit is {MAX_URLS_PER_SITEMAP}"
+
+    for index_entry in index:
+        if not _is_absolute_url(index_entry.loc):
+            yield f"{path}: {index_entry.loc}: loc is not an absolute http(s) URL"
+        child_path = path.parent / Path(urlsplit(index_entry.loc).path).name
+        if child_path.exists():
+            yield from _iter_problems(child_path)
+        else:
+            yield f"{path}: {index_entry.loc}: not found on disk at {child_path}"
+
+
+def _url_entry_problems(url_entry: URLEntry) -> Iterator[str]:
+    if not _is_absolute_url(url_entry.loc):
+        yield "loc is not an absolute http(s) URL"
+    if url_entry.lastmod and not _W3C_DATETIME.match(url_entry.lastmod):
+        yield f"lastmod is not a W3C datetime: {url_entry.lastmod}"
+    if url_entry.changefreq and url_entry.changefreq not in CHANGEFREQ_VALUES:
+        yield f"changefreq is not valid: {url_entry.changefreq}"
+    if url_entry.priority is not None and not 0.0 <= url_entry.priority <= 1.0:
+        yield f"priority must be between 0.0 and 1.0: {url_entry.priority}"
+    for image in url_entry.images:
+        if not _is_absolute_url(image.loc):
+            yield f"image loc is not an absolute http(s) URL: {image.loc}"
+
+
+def _is_absolute_url(url: str) -> bool:
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and bool(parts.netloc)
+
+
+def _uncompressed_size(path: Path) -> int:
+    if path.suffix != ".gz":
+        return path.stat().st_size
+
+    size = 0
+    with gzip.open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            size += len(chunk)
+    return size
@@ -0,0 +1,331 @@
+from datetime import datetime, timedelta, timezone
+import heapq
+from itertools import count
+from pathlib import Path
+import re
+import time
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterable, Iterator
+
+from .sitemapy import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_COMPRESS_LEVEL,
+    NewsEntry,
+    Sitemap,
+    URLEntry,
+    _get_serializer,
+    _is_file_like,
+    _iter_fixed_chunks,
+    _write_pieces,
+)
+
+if TYPE_CHECKING:
+    from .serializers import SitemapSerializer
+
+MAX_NEWS_URLS = 1_000
+MAX_NEWS_AGE = timedelta(days=2)
+
+# W3C datetimes allow any number of fraction digits, fromisoformat before
+# Python 3.11 only 3 or 6
+_FRACTION = re.compile(r"(?<=:\d{2})\.(\d+)")
+
+
+def parse_publication_date(value: str | datetime) -> float:
+    """
+    POSIX timestamp of a W3C datetime string or datetime. Values without a
+    timezone are taken as UTC.
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        if text.endswith(("Z", "z")):
+            text = f"{text[:-1]}+00:00"
+        text = _FRACTION.sub(lambda m: f".{m.group(1)[:6].ljust(6, '0')}", text)
+        try:
+            value = datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"Invalid publication date: {value!r}") from None
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return value.timestamp()
+
+
+class _NewsItem:
+    __slots__ = ("timestamp", "seq", "url_entry", "rendered")
+
+    def __init__(self, timestamp: float, seq: int, url_entry: URLEntry):
+        self.timestamp = timestamp
+        self.seq = seq
+        self.url_entry = url_entry
+        self.rendered: bytes | None = None
+
+
+class NewsSitemap:
+    """Rolling Google News sitemap holding only recent articles.
+
+    Articles are indexed by publication time in a min-heap, so expiring the
+    oldest one costs O(log n). Every article is serialized once, when it is
+    published, and the document is regenerated from those pieces only when
+    something changed, so each publish costs milliseconds rather than a full
+    rebuild.
+
+    Args:
+        publication_name (str): <news:name> of every article
+        publication_language (str): <news:language> of every article, e.g. "en"
+        max_age (timedelta): articles older than this are evicted. Default = 2 days
+        max_urls (int): articles kept, the oldest are evicted first. Default = 1,000
+        serializer (str or SitemapSerializer) [Optional]: serializer backend. Default = "template"
+        clock (callable) [Optional]: returns the current POSIX time. Default = time.time
+    """
+
+    def __init__(
+        self,
+        publication_name: str,
+        publication_language: str,
+        max_age: timedelta = MAX_NEWS_AGE,
+        max_urls: int = MAX_NEWS_URLS,
+        serializer: "str | SitemapSerializer | None" = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_urls <= 0:
+            raise ValueError(f"max_urls must be positive. received: {max_urls}")
+
+        self.publication_name = publication_name
+        self.publication_language = publication_language
+        self.max_age = max_age
+        self.max_urls = max_urls
+        self.serializer = _get_serializer(serializer)
+        self.clock = clock
+
+        self._items: dict[str, _NewsItem] = {}
+        # (timestamp, seq, loc). Items replaced or removed stay until popped
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = count()
+        self._document: bytes | None = None
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path,
+        publication_name: str,
+        publication_language: str,
+        **kwargs,
+    ) -> "NewsSitemap":
+        """
+        Load an existing news sitemap, e.g. to resume after a restart. URLs
+        without a publication date are skipped, and expired ones are evicted.
+
+        Args:
+            path (str or Path): filepath to a news sitemap (.xml or .xml.gz)
+            publication_name (str): <news:name> of new articles
+            publication_language (str): <news:language> of new articles
+            **kwargs: passed to NewsSitemap (max_age, max_urls, serializer, clock)
+
+        Returns:
+            NewsSitemap: instance of NewsSitemap
+        """
+        instance = cls(publication_name, publication_language, **kwargs)
+        instance.extend(
+            url
+            for url in Sitemap.iter_file(path)
+            if url.news_entry and url.news_entry.publication_date
+        )
+
+        return instance
+
+    def publish(
+        self,
+        loc: str | URLEntry,
+        publication_date: str | datetime | None = None,
+        title: str | None = None,
+    ) -> "NewsSitemap":
+        """
+        Add or replace an article, then evict expired and excess articles.
+
+        Args:
+            loc (str or URLEntry): article URL, or a URLEntry carrying a NewsEntry
+            publication_date (str or datetime) [Optional]: W3C datetime. Default = now
+            title (str) [Optional]: article title
+
+        Returns:
+            NewsSitemap: the instance, for chaining
+        """
+        self._add(self._news_url_entry(loc, publication_date, title))
+        self.evict()
+
+        return self
+
+    def extend(self, url_entries: Iterable[URLEntry]) -> "NewsSitemap":
+        """Publish every URLEntry with a NewsEntry, evicting once at the end"""
+        for url_entry in url_entries:
+            self._add(self._news_url_entry(url_entry, None, None))
+        self.evict()
+
+        return self
+
+    def remove(self, loc: str) -> "NewsSitemap":
+        """Remove an article, e.g. when it is unpublished"""
+        if self._items.pop(loc, None) is not None:
+            self._document = None
+            self._maybe_compact()
+
+        return self
+
+    def evict(self, now: float | None = None) -> list[URLEntry]:
+        """
+        Drop articles older than max_age and the oldest beyond max_urls.
+
+        Args:
+            now (float) [Optional]: POSIX time to evict against. Default = clock()
+
+        Returns:
+            list[URLEntry]: the evicted articles, oldest first
+        """
+        cutoff = (self.clock() if now is None else now) - self.max_age.total_seconds()
+        heap = self._heap
+        items = self._items
+        evicted = []
+
+        while heap:
+            timestamp, seq, loc = heap[0]
+            item = items.get(loc)
+            if item is None or item.seq != seq:
+                heapq.heappop(heap)  # replaced or removed
+            elif timestamp < cutoff or len(items) > self.max_urls:
+                heapq.heappop(heap)
+                del items[loc]
+                evicted.append(item.url_entry)
+            else:
+                break
+
+        if evicted:
+            self._document = None
+
+        return evicted
+
+    def to_sitemap(self) -> Sitemap:
+        """Current articles as a Sitemap, newest first"""
+        self.evict()
+        sitemap = Sitemap(serializer=self.serializer)
+        sitemap.urls = [item.url_entry for item in self._newest_first()]
+
+        return sitemap
+
+    def to_bytes(
+        self, compress: bool = False, compress_level: int = DEFAULT_COMPRESS_LEVEL
+    ) -> bytes:
+        """Return the serialized news sitemap, optionally gzip compressed"""
+        if not compress:
+            return self._get_document()
+
+        return b"".join(
+            _iter_fixed_chunks(
+                [self._get_document()], DEFAULT_CHUNK_SIZE, True, compress_level
+            )
+        )
+
+    def write_to_file(
+        self, output_filename: str | Path | BinaryIO = "sitemap-news.xml"
+    ) -> "NewsSitemap":
+        """Write the news sitemap to a path or binary file-like object.
+        Paths ending in .gz are compressed"""
+        compress = not _is_file_like(output_filename) and str(output_filename).endswith(
+            ".gz"
+        )
+        _write_pieces(output_filename, [self._get_document()], compress=compress)
+
+        return self
+
+    def _news_url_entry(
+        self,
+        loc: str | URLEntry,
+        publication_date: str | datetime | None,
+        title: str | None,
+    ) -> URLEntry:
+        if isinstance(loc, URLEntry):
+            url_entry = loc
+        else:
+            url_entry = URLEntry(loc=loc)
+
+        news_entry = url_entry.news_entry
+        if news_entry is None:
+            news_entry = NewsEntry(
+                publication_name=self.publication_name,
+                publication_language=self.publication_language,
+            )
+            url_entry.add_news_entry(news_entry)
+        if news_entry.publication_name is None:
+            news_entry.publication_name = self.publication_name
+        if news_entry.publication_language is None:
+            news_entry.publication_language = self.publication_language
+
+        if publication_date is not None:
+            news_entry.publication_date = publication_date
+        if title is not None:
+            news_entry.title = title
+
+        if news_entry.publication_date is None:
+            news_entry.publication_date = datetime.fromtimestamp(
+                self.clock(), timezone.utc
+            )
+        if isinstance(news_entry.publication_date, datetime):
+            date = news_entry.publication_date
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+            news_entry.publication_date = date.isoformat(timespec="seconds")
+
+        return url_entry
+
+    def _add(self, url_entry: URLEntry):
+        timestamp = parse_publication_date(url_entry.news_entry.publication_date)
+        item = _NewsItem(timestamp, next(self._seq), url_entry)
+        self._items[url_entry.loc] = item
+        heapq.heappush(self._heap, (timestamp, item.seq, url_entry.loc))
+        self._document = None
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Rebuild the heap once stale entries outnumber live ones"""
+        if len(self._heap) > 2 * len(self._items) + 64:
+            self._heap = [
+                (item.timestamp, item.seq, loc) for loc, item in self._items.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _newest_first(self) -> list[_NewsItem]:
+        return sorted(
+            self._items.values(), key=lambda i: (i.timestamp, i.seq), reverse=True
+        )
+
+    def _get_document(self) -> bytes:
+        """Serialized document, rebuilt from cached per-article pieces on change"""
+        # Articles also expire while nothing is published
+        self.evict()
+        if self._document is None:
+            items = self._newest_first()
+            serializer = self.serializer
+            pieces = [serializer.urlset_header(self._namespaces(items))]
+            for item in items:
+                if item.rendered is None:
+                    item.rendered = serializer.url(item.url_entry)
+                pieces.append(item.rendered)
+            pieces.append(serializer.urlset_footer)
+            self._document = b"".join(pieces)
+
+        return self._document
+
+    @staticmethod
+    def _namespaces(items: list[_NewsItem]) -> dict[str, str]:
+        sitemap = Sitemap()
+        sitemap.urls = [item.url_entry for item in items]
+        return sitemap._get_required_namespaces()
+
+    def __contains__(self, loc: str) -> bool:
+        return loc in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[URLEntry]:
+        self.evict()
+        return (item.url_entry for item in self._newest_first())
@@ -0,0 +1,247 @@
+from array import array
+from functools import lru_cache
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+TRACKING_PARAMS = (
+    "utm_*",
+    "gclid",
+    "fbclid",
+    "msclkid",
+    "mc_cid",
+    "mc_eid",
+)
+
+TRAILING_SLASH_POLICIES = ("keep", "add", "strip")
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+_UNRESERVED = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+)
+_PERCENT_ESCAPE = re.compile(r"%[0-9A-Fa-f]{2}")
+
+
+def _normalize_escape(match: re.Match) -> str:
+    """Decode escaped unreserved characters, uppercase all other escapes"""
+    char = chr(int(match.group(0)[1:], 16))
+    if char in _UNRESERVED:
+        return char
+    return match.group(0).upper()
+
+
+def normalize_percent_encoding(value: str) -> str:
+    """Normalize percent-escapes in a URL component (RFC 3986 section 6.2.2)"""
+    if "%" not in value:
+        return value
+    return _PERCENT_ESCAPE.sub(_normalize_escape, value)
+
+
+def url_digest(url: str) -> int:
+    """Return a 64-bit digest of a URL for memory-light set membership"""
+    return int.from_bytes(
+        hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class _DigestSet:
+    """Set of 64-bit digests stored in an open-addressed array.
+
+    Takes 16 to 32 bytes per digest, against about 70 for a set of Python ints.
+    Digests are already uniform, so their low bits are used as the slot.
+    """
+
+    __slots__ = ("_slots", "_mask", "_count")
+
+    def __init__(self, expected: int = 0):
+        size = 16
+        while size < 2 * expected:
+            size *= 2
+        self._slots = array("Q", [0]) * size
+        self._mask = size - 1
+        self._count = 0
+
+    def add(self, digest: int) -> bool:
+        """Add a digest, returning whether it was new"""
+        digest = digest or 1  # 0 marks an empty slot
+        slots = self._slots
+        mask = self._mask
+        i = digest & mask
+        while slots[i]:
+            if slots[i] == digest:
+                return False
+            i = (i + 1) & mask
+        slots[i] = digest
+        self._count += 1
+        if 2 * self._count > mask:
+            self._grow()
+
+        return True
+
+    def _grow(self):
+        old = self._slots
+        size = 2 * len(old)
+        self._slots = array("Q", [0]) * size
+        self._mask = mask = size - 1
+        slots = self._slots
+        for digest in old:
+            if digest:
+                i = digest & mask
+                while slots[i]:
+                    i = (i + 1) & mask
+                slots[i] = digest
+
+    def __contains__(self, digest: int) -> bool:
+        digest = digest or 1
+        slots = self._slots
+        mask = self._mask
+        i = digest & mask
+        while slots[i]:
+            if slots[i] == digest:
+                return True
+            i = (i + 1) & mask
+
+        return False
+
+    def __len__(self):
+        return self._count
+
+
+class URLNormalizer:
+    """Configurable pipeline that maps equivalent URLs to one canonical string.
+
+    Host and path normalization results are memoized, since large sitemaps
+    repeat the same few hosts and many of the same paths.
+
+    Args:
+        lowercase_host (bool): lowercase scheme and host. Default = True
+        remove_default_port (bool): drop :80 for http and :443 for https. Default = True
+        trailing_slash (str): one of "keep", "add" or "strip". Default = "keep"
+        normalize_escapes (bool): decode unreserved escapes and uppercase
+            the rest. Default = True
+        sort_query (bool): sort query parameters. Default = True
+        strip_params (tuple): query parameter names to drop, a trailing "*" matches
+            by prefix. Default = TRACKING_PARAMS
+        remove_fragment (bool): drop the #fragment. Default = True
+        cache_size (int): entries kept per memoized component. Default = 65536
+    """
+
+    def __init__(
+        self,
+        lowercase_host: bool = True,
+        remove_default_port: bool = True,
+        trailing_slash: str = "keep",
+        normalize_escapes: bool = True,
+        sort_query: bool = True,
+        strip_params: tuple[str, ...] = TRACKING_PARAMS,
+        remove_fragment: bool = True,
+        cache_size: int = 65536,
+    ):
+        if trailing_slash not in TRAILING_SLASH_POLICIES:
+            raise ValueError(
+                f"trailing_slash must be one of {TRAILING_SLASH_POLICIES}. "
+                f"received: {trailing_slash}"
+            )
+
+        self.lowercase_host = lowercase_host
+        self.remove_default_port = remove_default_port
+        self.trailing_slash = trailing_slash
+        self.normalize_escapes = normalize_escapes
+        self.sort_query = sort_query
+        self.remove_fragment = remove_fragment
+
+        strip_params = tuple(strip_params or ())
+        self._strip_names = frozenset(p for p in strip_params if not p.endswith("*"))
+        self._strip_prefixes = tuple(p[:-1] for p in strip_params if p.endswith("*"))
+
+        self._netloc = lru_cache(maxsize=cache_size)(self._normalize_netloc)
+        self._path = lru_cache(maxsize=cache_size)(self._normalize_path)
+
+    def normalize(self, url: str) -> str:
+        """Return the normalized form of a single URL"""
+        scheme, netloc, path, query, fragment = urlsplit(url)
+
+        if self.lowercase_host:
+            scheme = scheme.lower()
+
+        netloc = self._netloc(scheme, netloc)
+        path = self._path(path, bool(netloc))
+
+        if query:
+            query = self._normalize_query(query)
+
+        if self.remove_fragment:
+            fragment = ""
+
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    def normalize_many(self, urls) -> list[str]:
+        """Normalize an iterable of URLs, sharing the memoized host/path parts"""
+        normalize = self.normalize
+        return [normalize(url) for url in urls]
+
+    def clear_cache(self) -> "URLNormalizer":
+        """Drop memoized host and path results"""
+        self._netloc.cache_clear()
+        self._path.cache_clear()
+
+        return self
+
+    def _normalize_netloc(self, scheme: str, netloc: str) -> str:
+        """Normalize host case and default port"""
+        if not netloc:
+            return netloc
+
+        userinfo, at, hostport = netloc.rpartition("@")
+
+        if self.lowercase_host:
+            hostport = hostport.lower()
+
+        if self.remove_default_port:
+            host, colon, port = hostport.rpartition(":")
+            # Skip IPv6 literals without a port, e.g. [::1]
+            if colon and not port.endswith("]") and DEFAULT_PORTS.get(scheme) == port:
+                hostport = host
+
+        return f"{userinfo}{at}{hostport}"
+
+    def _normalize_path(self, path: str, has_netloc: bool) -> str:
+        """Normalize percent-encoding and trailing slash of a path"""
+        if self.normalize_escapes:
+            path = normalize_percent_encoding(path)
+
+        if not path:
+            return "/" if has_netloc else path
+
+        if path != "/":
+            if self.trailing_slash == "strip":
+                path = path.rstrip("/") or "/"
+            elif self.trailing_slash == "add" and not path.endswith("/"):
+                # Leave file-like paths (e.g. /feed.xml) alone
+                if "." not in path.rsplit("/", 1)[-1]:
+                    path += "/"
+
+        return path
+
+    def _normalize_query(self, query: str) -> str:
+        """Drop configured params, normalize escapes and sort the remainder"""
+        params = []
+        for param in query.split("&"):
+            if not param:
+                continue
+            if self.normalize_escapes:
+                param = normalize_percent_encoding(param)
+            if self._is_stripped(param.partition("=")[0]):
+                continue
+            params.append(param)
+
+        if self.sort_query:
+            params.sort()
+
+        return "&".join(params)
+
+    def _is_stripped(self, name: str) -> bool:
+        if name in self._strip_names:
+            return True
+        return bool(self._strip_prefixes) and name.startswith(self._strip_prefixes)
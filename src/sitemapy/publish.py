@@ -0,0 +1,200 @@
+import os
+from pathlib import Path
+import re
+import secrets
+import shutil
+import tempfile
+import time
+from typing import BinaryIO
+
+from .sitemapy import ShardedSitemapWriter, SitemapIndex, _current_umask
+
+SWAP_MODES = ("symlink", "replace")
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class AtomicShardedSitemapWriter(ShardedSitemapWriter):
+    """ShardedSitemapWriter that publishes the whole sitemap set at once.
+
+    Shards and the index are written to a staging directory next to the target
+    with large buffered writes and no per-file fsync. On close every file is
+    synced in one pass and the set is swapped in. If the job fails or dies
+    before that, the files already being served are left untouched.
+
+    Swap modes:
+        symlink: the target is a symlink to the current set and is flipped to the
+            staging directory with an atomic rename, so crawlers see either the
+            old set or the new one. A plain directory already at the target is
+            moved aside on the first publish. Requires symlink support (POSIX)
+        replace: each file is renamed into the target directory, shards first and
+            the index last. Every file is complete at all times, but during the
+            swap the index may be served alongside a mix of old and new shards.
+            Shards left over from a larger previous set are removed afterwards
+
+    Publishing to the same target from several processes at once is not supported.
+
+    Args:
+        directory (str or Path): the target directory, served to crawlers
+        base_url (str): public URL of the directory, used for index entries
+        swap (str): "symlink" or "replace". Default = "symlink"
+        keep (int): previous sets kept next to the target in symlink mode, for rollback. Default = 1
+        buffer_size (int): write buffer per file in bytes. Default = 1MB
+        **kwargs: passed to ShardedSitemapWriter (prefix, max_urls, compress, workers...)
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        base_url: str,
+        swap: str = "symlink",
+        keep: int = 1,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        **kwargs,
+    ):
+        if swap not in SWAP_MODES:
+            raise ValueError(
+                f"Unknown swap mode: {swap}. Available: {', '.join(SWAP_MODES)}"
+            )
+        if keep < 0:
+            raise ValueError(f"keep must not be negative. received: {keep}")
+        if kwargs.get("opener") is not None:
+            raise ValueError("opener is not supported when publishing atomically")
+
+        self.target = Path(directory)
+        self.swap = swap
+        self.keep = keep
+        self.buffer_size = buffer_size
+        self._written: list[Path] = []
+
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        self.staging = Path(
+            tempfile.mkdtemp(prefix=self._staging_prefix(), dir=self.target.parent)
+        )
+        try:
+            super().__init__(self.staging, base_url, opener=self._open_staged, **kwargs)
+        except BaseException:
+            shutil.rmtree(self.staging, ignore_errors=True)
+            raise
+
+    def close(self) -> SitemapIndex:
+        """Finish every file, sync them and swap the new set in"""
+        try:
+            super().close()
+            self._sync()
+        except BaseException:
+            self._discard()
+            raise
+
+        if self.swap == "symlink":
+            # mkdtemp directories are private, the served set must be readable
+            os.chmod(self.staging, 0o777 & ~_current_umask())
+            self._flip_symlink()
+        else:
+            self._replace_files()
+        self.directory = self.target
+        self._prune()
+
+        return self.index
+
+    def _abort(self):
+        super()._abort()
+        self._discard()
+
+    def _staging_prefix(self) -> str:
+        return f".{self.target.name}.sitemapy-staging-"
+
+    def _version_prefix(self) -> str:
+        return f".{self.target.name}.sitemapy-set-"
+
+    def _version_path(self) -> Path:
+        """New name for a published set. Names sort in publish order"""
+        name = f"{self._version_prefix()}{time.time_ns():020d}-{secrets.token_hex(4)}"
+        return self.target.with_name(name)
+
+    def _open_staged(self, name: str) -> BinaryIO:
+        path = self.staging / name
+        f = open(path, "wb", buffering=self.buffer_size)
+        self._written.append(path)
+        return f
+
+    def _sync(self):
+        """Flush every staged file to disk in one pass, after all writes are done"""
+        for path in self._written:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        _fsync_dir(self.staging)
+
+    def _discard(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+    def _flip_symlink(self):
+        target = self.target
+
+        if target.is_dir() and not target.is_symlink():
+            # First publish over a plain directory. Moved aside, it is pruned
+            # like any previous set
+            os.rename(target, self._version_path())
+        elif target.exists() and not target.is_symlink():
+            raise ValueError(f"{target} exists and is not a directory")
+
+        # Only published sets carry the version prefix, so staging left by a
+        # crashed run can never be mistaken for one
+        version = self._version_path()
+        os.rename(self.staging, version)
+        link = version.with_name(f"{version.name}.link")
+        os.symlink(version.name, link, target_is_directory=True)
+        os.replace(link, target)
+        _fsync_dir(target.parent)
+
+    def _replace_files(self):
+        target = self.target
+        target.mkdir(parents=True, exist_ok=True)
+
+        # The index is written last, so it is also swapped in last
+        names = set()
+        for path in self._written:
+            os.replace(path, target / path.name)
+            names.add(path.name)
+        _fsync_dir(target)
+
+        shard = re.compile(rf"^{re.escape(self.prefix)}-\d+\.xml(\.gz)?$")
+        for path in target.iterdir():
+            if shard.match(path.name) and path.name not in names:
+                path.unlink()
+
+        self._discard()
+
+    def _prune(self):
+        """Remove previous sets beyond keep, and staging left by crashed runs"""
+        staging_prefix = self._staging_prefix()
+        version_prefix = self._version_prefix()
+        current = os.readlink(self.target) if self.target.is_symlink() else None
+
+        versions = []
+        for path in self.target.parent.iterdir():
+            if path.is_symlink() or not path.is_dir():
+                continue
+            if path.name.startswith(staging_prefix) and path != self.staging:
+                # Never published, a run died before swapping it in
+                shutil.rmtree(path, ignore_errors=True)
+            elif path.name.startswith(version_prefix) and path.name != current:
+                versions.append(path)
+        versions.sort(key=lambda path: path.name, reverse=True)
+
+        keep = self.keep if self.swap == "symlink" else 0
+        for path in versions[keep:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _fsync_dir(path: Path):
+    """Persist renames and new entries in a directory. A no-op where unsupported"""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
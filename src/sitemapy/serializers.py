@@ -0,0 +1,452 @@
+import io
+import threading
+from typing import Iterable, Iterator
+import xml.etree.ElementTree as ET
+
+from .sitemapy import (
+    EXTENSION_XMLNS,
+    SITEMAP_XMLNS,
+    HreflangCluster,
+    IndexEntry,
+    Sitemap,
+    SitemapIndex,
+    URLEntry,
+)
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - exercised when lxml is not installed
+    lxml_etree = None
+
+_XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8'?>\n"
+
+
+class SitemapSerializer:
+    """Backend interface turning entries into sitemap XML, one element at a time.
+
+    Subclasses implement url() and sitemap(). Each returns a single element,
+    indented as a child of the document root, so writers can stream documents
+    of any size and measure every entry before writing it.
+    """
+
+    name = ""
+
+    urlset_footer = b"</urlset>"
+    sitemapindex_footer = b"</sitemapindex>"
+
+    def urlset_header(self, namespaces: dict[str, str]) -> bytes:
+        """XML declaration and <urlset> start tag"""
+        attribs = "".join(f' {name}="{uri}"' for name, uri in namespaces.items())
+        return (
+            f'{_XML_DECLARATION}<urlset{attribs} xmlns="{SITEMAP_XMLNS}">\n'
+        ).encode("utf-8")
+
+    def sitemapindex_header(self) -> bytes:
+        """XML declaration and <sitemapindex> start tag"""
+        return (f'{_XML_DECLARATION}<sitemapindex xmlns="{SITEMAP_XMLNS}">\n').encode(
+            "utf-8"
+        )
+
+    def url(self, url_entry: URLEntry) -> bytes:
+        """Serialize a single <url> element"""
+        raise NotImplementedError
+
+    def sitemap(self, index_entry: IndexEntry) -> bytes:
+        """Serialize a single <sitemap> index element"""
+        raise NotImplementedError
+
+    def iter_urlset(
+        self, url_entries: Iterable[URLEntry], namespaces: dict[str, str]
+    ) -> Iterator[bytes]:
+        """Serialized <urlset> document, one piece per <url> element"""
+        yield self.urlset_header(namespaces)
+        url = self.url
+        for url_entry in url_entries:
+            yield url(url_entry)
+        yield self.urlset_footer
+
+    def iter_sitemapindex(self, index_entries: Iterable[IndexEntry]) -> Iterator[bytes]:
+        """Serialized <sitemapindex> document, one piece per <sitemap> element"""
+        yield self.sitemapindex_header()
+        sitemap = self.sitemap
+        for index_entry in index_entries:
+            yield sitemap(index_entry)
+        yield self.sitemapindex_footer
+
+
+class ElementTreeSerializer(SitemapSerializer):
+    """Reference backend built on xml.etree.ElementTree"""
+
+    name = "etree"
+
+    def url(self, url_entry: URLEntry) -> bytes:
+        root = ET.Element("urlset")
+        Sitemap._append_url_element(root=root, url_entry=url_entry)
+        return self._serialize_child(root[0])
+
+    def sitemap(self, index_entry: IndexEntry) -> bytes:
+        root = ET.Element("sitemapindex")
+        SitemapIndex._append_sitemap_element(root=root, index_entry=index_entry)
+        return self._serialize_child(root[0])
+
+    @staticmethod
+    def _serialize_child(element: ET.Element) -> bytes:
+        ET.indent(element, space="   ", level=1)
+        return b"   " + ET.tostring(element, encoding="utf-8") + b"\n"
+
+
+def _escape_text(text: str) -> str:
+    """Escape character data the way ElementTree does"""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attrib(text: str) -> str:
+    """Escape an attribute value the way ElementTree does"""
+    text = _escape_text(text)
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def _text_element(indent: str, tag: str, text: str | None) -> str:
+    if not text:
+        return f"{indent}<{tag} />\n"
+    return f"{indent}<{tag}>{_escape_text(text)}</{tag}>\n"
+
+
+def _render_links(alternates) -> str:
+    return "".join(
+        f'      <xhtml:link rel="alternate" hreflang="{_escape_attrib(alt.hreflang)}" '
+        f'href="{_escape_attrib(alt.href)}" />\n'
+        for alt in alternates
+    )
+
+
+def _cluster_link_block(cluster: HreflangCluster) -> str:
+    """Rendered <xhtml:link> block of a cluster, built once and reused"""
+    if cluster._link_block is None:
+        cluster._link_block = _render_links(cluster.alternates)
+    return cluster._link_block
+
+
+def _render_news(news_entry) -> str:
+    parts = []
+    if news_entry.publication_name or news_entry.publication_language:
+        parts.append("         <news:publication>\n")
+        if news_entry.publication_name:
+            parts.append(
+                _text_element("            ", "news:name", news_entry.publication_name)
+            )
+        if news_entry.publication_language:
+            parts.append(
+                _text_element(
+                    "            ", "news:language", news_entry.publication_language
+                )
+            )
+        parts.append("         </news:publication>\n")
+    if news_entry.publication_date:
+        parts.append(
+            _text_element(
+                "         ", "news:publication_date", news_entry.publication_date
+            )
+        )
+    if news_entry.title:
+        parts.append(_text_element("         ", "news:title", news_entry.title))
+
+    if not parts:
+        return "      <news:news />\n"
+    return f"      <news:news>\n{''.join(parts)}      </news:news>\n"
+
+
+class TemplateSerializer(SitemapSerializer):
+    """Hand-tuned backend formatting elements directly as strings.
+
+    Produces byte-identical output to ElementTreeSerializer without building
+    any element objects.
+    """
+
+    name = "template"
+
+    def url(self, url_entry: URLEntry) -> bytes:
+        parts = [_text_element("      ", "loc", url_entry.loc)]
+
+        if url_entry.lastmod is not None:
+            parts.append(_text_element("      ", "lastmod", url_entry.lastmod))
+        if url_entry.changefreq is not None:
+            parts.append(_text_element("      ", "changefreq", url_entry.changefreq))
+        if url_entry.priority is not None:
+            parts.append(f"      <priority>{url_entry.priority}</priority>\n")
+        if url_entry.hreflang_cluster:
+            parts.append(_cluster_link_block(url_entry.hreflang_cluster))
+        if url_entry.hreflang_alts:
+            parts.append(_render_links(url_entry.hreflang_alts))
+        for image in url_entry.images:
+            parts.append(
+                "      <image:image>\n"
+                f"{_text_element('         ', 'image:loc', image.loc)}"
+                "      </image:image>\n"
+            )
+        if url_entry.news_entry:
+            parts.append(_render_news(url_entry.news_entry))
+
+        return f"   <url>\n{''.join(parts)}   </url>\n".encode("utf-8")
+
+    def sitemap(self, index_entry: IndexEntry) -> bytes:
+        lastmod = ""
+        if index_entry.lastmod is not None:
+            lastmod = _text_element("      ", "lastmod", index_entry.lastmod)
+        return (
+            f"   <sitemap>\n{_text_element('      ', 'loc', index_entry.loc)}"
+            f"{lastmod}   </sitemap>\n"
+        ).encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    """Write target for lxml.etree.xmlfile that hands back what was written"""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+_NSMAP = {None: SITEMAP_XMLNS}
+_NSMAP.update({name.split(":")[1]: uri for name, uri in EXTENSION_XMLNS.items()})
+
+_S = f"{{{SITEMAP_XMLNS}}}"
+_IMAGE = f"{{{EXTENSION_XMLNS['xmlns:image']}}}"
+_NEWS = f"{{{EXTENSION_XMLNS['xmlns:news']}}}"
+
+# Qualified tag -> tag as written in the document, for raw empty elements
+_PREFIXED = {f"{_S}{tag}": tag for tag in ("loc", "lastmod", "changefreq", "priority")}
+_PREFIXED[f"{_IMAGE}loc"] = "image:loc"
+_PREFIXED.update(
+    {
+        f"{_NEWS}{tag}": f"news:{tag}"
+        for tag in ("name", "language", "publication_date", "title")
+    }
+)
+
+
+class LxmlSerializer(SitemapSerializer):
+    """Backend writing through lxml's incremental xmlfile writer.
+
+    Every thread keeps one open xmlfile context, inside a <urlset> element that
+    declares all extension namespaces, so elements are written with the
+    document's prefixes and no per-element namespace declarations.
+
+    Output matches ElementTreeSerializer byte for byte, except that a carriage
+    return in text is written as &#13; rather than raw, so it survives parsing.
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        if lxml_etree is None:
+            raise ImportError("The lxml serializer requires lxml: pip install lxml")
+        self._local = threading.local()
+
+    def url(self, url_entry: URLEntry) -> bytes:
+        return self._send("urlset", url_entry)
+
+    def sitemap(self, index_entry: IndexEntry) -> bytes:
+        return self._send("sitemapindex", index_entry)
+
+    def _send(self, root: str, entry) -> bytes:
+        try:
+            return self._writer(root).send(entry)
+        except BaseException:
+            # The generator is finished once render raises, start a new one next time
+            if hasattr(self._local, root):
+                delattr(self._local, root)
+            raise
+
+    def _writer(self, root: str):
+        writer = getattr(self._local, root, None)
+        if writer is None:
+            render = self._render_url if root == "urlset" else self._render_sitemap
+            writer = self._run(root, render)
+            next(writer)
+            setattr(self._local, root, writer)
+        return writer
+
+    @staticmethod
+    def _run(root: str, render):
+        sink = _Sink()
+        with lxml_etree.xmlfile(sink, encoding="utf-8") as xf:
+            with xf.element(f"{_S}{root}", nsmap=_NSMAP):
+                xf.flush()
+                sink.take()
+                entry = yield
+                while True:
+                    render(xf, sink, entry)
+                    xf.flush()
+                    entry = yield sink.take()
+
+    @staticmethod
+    def _raw(xf, sink: _Sink, text: str):
+        """Write markup around lxml, which never self-closes elements"""
+        xf.flush()
+        sink.write(text.encode("utf-8"))
+
+    def _text(self, xf, sink: _Sink, indent: str, tag: str, text: str | None):
+        if not text:
+            self._raw(xf, sink, f"{indent}<{_PREFIXED[tag]} />")
+            return
+        xf.write(indent)
+        with xf.element(tag):
+            xf.write(text)
+
+    def _render_url(self, xf, sink: _Sink, url_entry: URLEntry):
+        text = self._text
+        xf.write("   ")
+        with xf.element(f"{_S}url"):
+            text(xf, sink, "\n      ", f"{_S}loc", url_entry.loc)
+            if url_entry.lastmod is not None:
+                text(xf, sink, "\n      ", f"{_S}lastmod", url_entry.lastmod)
+            if url_entry.changefreq is not None:
+                text(xf, sink, "\n      ", f"{_S}changefreq", url_entry.changefreq)
+            if url_entry.priority is not None:
+                text(xf, sink, "\n      ", f"{_S}priority", str(url_entry.priority))
+            xf.write("\n")
+            if url_entry.hreflang_cluster:
+                # Reuse the pre-rendered block
+                self._raw(xf, sink, _cluster_link_block(url_entry.hreflang_cluster))
+            if url_entry.hreflang_alts:
+                self._raw(xf, sink, _render_links(url_entry.hreflang_alts))
+            for image in url_entry.images:
+                xf.write("      ")
+                with xf.element(f"{_IMAGE}image"):
+                    text(xf, sink, "\n         ", f"{_IMAGE}loc", image.loc)
+                    xf.write("\n      ")
+                xf.write("\n")
+            if url_entry.news_entry:
+                self._render_news(xf, sink, url_entry.news_entry)
+            xf.write("   ")
+        xf.write("\n")
+
+    def _render_news(self, xf, sink: _Sink, news_entry):
+        text = self._text
+        if not (
+            news_entry.publication_name
+            or news_entry.publication_language
+            or news_entry.publication_date
+            or news_entry.title
+        ):
+            self._raw(xf, sink, "      <news:news />\n")
+            return
+        xf.write("      ")
+        with xf.element(f"{_NEWS}news"):
+            if news_entry.publication_name or news_entry.publication_language:
+                xf.write("\n         ")
+                with xf.element(f"{_NEWS}publication"):
+                    if news_entry.publication_name:
+                        text(
+                            xf,
+                            sink,
+                            "\n            ",
+                            f"{_NEWS}name",
+                            news_entry.publication_name,
+                        )
+                    if news_entry.publication_language:
+                        text(
+                            xf,
+                            sink,
+                            "\n            ",
+                            f"{_NEWS}language",
+                            news_entry.publication_language,
+                        )
+                    xf.write("\n         ")
+            if news_entry.publication_date:
+                text(
+                    xf,
+                    sink,
+                    "\n         ",
+                    f"{_NEWS}publication_date",
+                    news_entry.publication_date,
+                )
+            if news_entry.title:
+                text(xf, sink, "\n         ", f"{_NEWS}title", news_entry.title)
+            xf.write("\n      ")
+        xf.write("\n")
+
+    def _render_sitemap(self, xf, sink: _Sink, index_entry: IndexEntry):
+        xf.write("   ")
+        with xf.element(f"{_S}sitemap"):
+            self._text(xf, sink, "\n      ", f"{_S}loc", index_entry.loc)
+            if index_entry.lastmod is not None:
+                self._text(xf, sink, "\n      ", f"{_S}lastmod", index_entry.lastmod)
+            xf.write("\n   ")
+        xf.write("\n")
+
+    def __getstate__(self):
+        # Open writers are per thread and per process
+        return {}
+
+    def __setstate__(self, state):
+        self._local = threading.local()
+
+
+SERIALIZERS = {
+    "etree": ElementTreeSerializer,
+    "template": TemplateSerializer,
+    "lxml": LxmlSerializer,
+}
+
+_instances: dict[str, SitemapSerializer] = {}
+
+
+DEFAULT_SERIALIZER = "template"
+
+
+def get_serializer(
+    serializer: str | SitemapSerializer | None = None,
+) -> SitemapSerializer:
+    """
+    Resolve a serializer backend.
+
+    Args:
+        serializer (str or SitemapSerializer) [Optional]: backend name ("etree",
+            "template" or "lxml") or instance. Default = "template"
+
+    Returns:
+        SitemapSerializer: the backend instance
+    """
+    if isinstance(serializer, SitemapSerializer):
+        return serializer
+
+    name = serializer or DEFAULT_SERIALIZER
+
+    instance = _instances.get(name)
+    if instance is None:
+        try:
+            cls = SERIALIZERS[name]
+        except KeyError:
+            raise ValueError(
+                f"Unknown serializer: {name}. Available: {', '.join(SERIALIZERS)}"
+            ) from None
+        instance = _instances[name] = cls()
+
+    return instance
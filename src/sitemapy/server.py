@@ -0,0 +1,298 @@
+import asyncio
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+import gzip
+import hashlib
+import re
+import threading
+import time
+from typing import Callable
+
+from .sitemapy import (
+    MAX_URLS_PER_SITEMAP,
+    Sitemap,
+    SitemapIndex,
+    _latest_lastmod,
+)
+
+_STATUS_TEXT = {
+    200: "200 OK",
+    304: "304 Not Modified",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+}
+
+
+class _CachedResponse:
+    __slots__ = ("body", "etag", "last_modified", "modified_time")
+
+    def __init__(
+        self, body: bytes, modified_time: float, previous: tuple[str, int] | None = None
+    ):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if previous is not None and previous[0] == self.etag:
+            # Unchanged content keeps its Last-Modified across reloads
+            modified_time = previous[1]
+        self.modified_time = int(modified_time)
+        self.last_modified = formatdate(self.modified_time, usegmt=True)
+
+
+class SitemapApp:
+    """WSGI/ASGI application serving a sitemap index and shards on demand.
+
+    Shards are rendered from the source Sitemap the first time they are
+    requested. The gzip bytes are kept in a bounded LRU cache, so repeated
+    crawler hits are served from memory. Responses carry ETag and Last-Modified
+    headers, and conditional GETs are answered with 304 Not Modified.
+
+    Routes, relative to the mount point:
+        /{prefix}-index.xml     sitemap index listing every shard
+        /{prefix}-{n}.xml       shard n, gzip Content-Encoding when accepted
+        /{prefix}-{n}.xml.gz    shard n as a gzip file
+
+    Args:
+        source (Sitemap or callable): the sitemap to serve, or a callable returning one
+        base_url (str): public URL the app is mounted at, used for index entries
+        prefix (str): shard filename prefix. Default = "sitemap"
+        max_urls (int): URLs per shard. Default = 50,000
+        compress_level (int): gzip compression level, 1-9. Default = 6
+        cache_size (int): rendered responses kept in memory. Default = 128
+        refresh_interval (float) [Optional]: seconds before a callable source is reloaded
+        max_age (int): Cache-Control max-age in seconds. Default = 3600
+    """
+
+    def __init__(
+        self,
+        source: Sitemap | Callable[[], Sitemap],
+        base_url: str,
+        prefix: str = "sitemap",
+        max_urls: int = MAX_URLS_PER_SITEMAP,
+        compress_level: int = 6,
+        cache_size: int = 128,
+        refresh_interval: float | None = None,
+        max_age: int = 3600,
+    ):
+        if max_urls <= 0:
+            raise ValueError(f"max_urls must be positive. received: {max_urls}")
+
+        self.source = source
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.prefix = prefix
+        self.max_urls = max_urls
+        self.compress_level = compress_level
+        self.cache_size = cache_size
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+
+        self._route = re.compile(
+            rf"^/{re.escape(prefix)}-(?:(index)\.xml|(\d+)\.xml(\.gz)?)$"
+        )
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._cache: OrderedDict[str, _CachedResponse] = OrderedDict()
+        # key -> (etag, modified_time) of the last rendering, kept across reloads
+        self._validators: dict[str, tuple[str, int]] = {}
+        self._sitemap: Sitemap | None = None
+        self._loaded_at = 0.0
+        self.refresh()
+
+    @property
+    def shard_count(self) -> int:
+        return self._shard_count(self._sitemap)
+
+    def _shard_count(self, sitemap: Sitemap) -> int:
+        return max(1, -(-len(sitemap) // self.max_urls))
+
+    def refresh(self) -> "SitemapApp":
+        """Reload the source and drop every cached response"""
+        with self._refresh_lock:
+            self._reload()
+
+        return self
+
+    def _reload(self):
+        sitemap = self.source() if callable(self.source) else self.source
+        with self._lock:
+            self._sitemap = sitemap
+            self._loaded_at = time.time()
+            self._cache.clear()
+
+    def __call__(self, environ: dict, start_response):
+        """WSGI entry point"""
+        headers = {
+            "if-none-match": environ.get("HTTP_IF_NONE_MATCH"),
+            "if-modified-since": environ.get("HTTP_IF_MODIFIED_SINCE"),
+            "accept-encoding": environ.get("HTTP_ACCEPT_ENCODING", ""),
+        }
+        status, response_headers, body = self.respond(
+            environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO", "/"), headers
+        )
+        start_response(_STATUS_TEXT[status], response_headers)
+
+        return [body]
+
+    async def asgi(self, scope: dict, receive, send):
+        """ASGI entry point, for HTTP scopes"""
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        headers = {}
+        for name, value in scope.get("headers", ()):
+            headers[name.decode("latin-1").lower()] = value.decode("latin-1")
+        headers.setdefault("accept-encoding", "")
+
+        # Rendering a shard is CPU bound, keep it off the event loop
+        status, response_headers, body = await asyncio.to_thread(
+            self.respond, scope["method"], scope["path"], headers
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (k.lower().encode("latin-1"), v.encode("latin-1"))
+                    for k, v in response_headers
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    def respond(
+        self, method: str, path: str, headers: dict[str, str | None]
+    ) -> tuple[int, list[tuple[str, str]], bytes]:
+        """Resolve a request to (status, headers, body). Header names are lowercase"""
+        if method not in ("GET", "HEAD"):
+            return 405, [("Allow", "GET, HEAD"), ("Content-Length", "0")], b""
+
+        match = self._route.match(path)
+        if match is None:
+            return 404, [("Content-Length", "0")], b""
+
+        is_index, number, as_file = match.groups()
+        self._maybe_refresh()
+        # One consistent view for the whole request, even if a reload lands meanwhile
+        with self._lock:
+            sitemap, loaded_at = self._sitemap, self._loaded_at
+
+        if is_index:
+            cached = self._get_cached(
+                "index", loaded_at, lambda: self._render_index(sitemap)
+            )
+        else:
+            number = int(number)
+            if not 1 <= number <= self._shard_count(sitemap):
+                return 404, [("Content-Length", "0")], b""
+            cached = self._get_cached(
+                str(number), loaded_at, lambda: self._render_shard(sitemap, number)
+            )
+
+        body = cached.body
+        etag = cached.etag
+        response_headers = [
+            ("ETag", etag),
+            ("Last-Modified", cached.last_modified),
+            ("Cache-Control", f"public, max-age={self.max_age}"),
+        ]
+
+        if as_file:
+            response_headers.append(("Content-Type", "application/gzip"))
+        else:
+            response_headers.append(("Content-Type", "application/xml; charset=utf-8"))
+            response_headers.append(("Vary", "Accept-Encoding"))
+            if "gzip" in (headers.get("accept-encoding") or ""):
+                response_headers.append(("Content-Encoding", "gzip"))
+            else:
+                body = None
+                etag = f'{etag[:-1]}-identity"'
+                response_headers[0] = ("ETag", etag)
+
+        if self._not_modified(headers, etag, cached.modified_time):
+            return 304, response_headers, b""
+
+        if body is None:
+            body = gzip.decompress(cached.body)
+
+        response_headers.append(("Content-Length", str(len(body))))
+        if method == "HEAD":
+            body = b""
+
+        return 200, response_headers, body
+
+    def _maybe_refresh(self):
+        if not self._is_stale():
+            return
+        # A single thread reloads, the others keep serving the current sitemap
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if self._is_stale():
+                self._reload()
+        finally:
+            self._refresh_lock.release()
+
+    def _is_stale(self) -> bool:
+        return (
+            self.refresh_interval is not None
+            and callable(self.source)
+            and time.time() - self._loaded_at >= self.refresh_interval
+        )
+
+    def _get_cached(self, key: str, loaded_at: float, render) -> _CachedResponse:
+        with self._lock:
+            # The cache only holds responses for the current sitemap
+            current = self._loaded_at == loaded_at
+            cached = self._cache.get(key) if current else None
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            previous = self._validators.get(key)
+
+        cached = _CachedResponse(render(), loaded_at, previous)
+
+        with self._lock:
+            # Skip caching if a refresh happened while rendering
+            if self._loaded_at == loaded_at:
+                self._validators[key] = (cached.etag, cached.modified_time)
+                self._cache[key] = cached
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return cached
+
+    def _shard_entries(self, sitemap: Sitemap, number: int) -> list:
+        start = (number - 1) * self.max_urls
+        return sitemap.urls[start : start + self.max_urls]
+
+    def _render_shard(self, sitemap: Sitemap, number: int) -> bytes:
+        shard = Sitemap()
+        shard.urls = self._shard_entries(sitemap, number)
+
+        return shard.to_bytes(compress=True, compress_level=self.compress_level)
+
+    def _render_index(self, sitemap: Sitemap) -> bytes:
+        index = SitemapIndex()
+        for number in range(1, self._shard_count(sitemap) + 1):
+            index.add_sitemap(
+                f"{self.base_url}{self.prefix}-{number}.xml.gz",
+                lastmod=_latest_lastmod(self._shard_entries(sitemap, number)),
+            )
+
+        return index.to_bytes(compress=True, compress_level=self.compress_level)
+
+    def _not_modified(self, headers: dict, etag: str, modified_time: int) -> bool:
+        if_none_match = headers.get("if-none-match")
+        if if_none_match:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return modified_time <= since
+
+        return False
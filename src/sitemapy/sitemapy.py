@@ -1,13 +1,124 @@
+import copy
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+import os
 from pathlib import Path
+import tempfile
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterable, Iterator
+from urllib.parse import urlsplit
 import xml.etree.ElementTree as ET
 import gzip
+import zlib
 
 from defusedxml import ElementTree as DefusedElementTree
 
+from .normalize import URLNormalizer, _DigestSet, url_digest
+
+if TYPE_CHECKING:
+    from .serializers import SitemapSerializer
+
 SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
 IMAGE_NS = "{http://www.google.com/schemas/sitemap-image/1.1}"
 NEWS_NS = "{http://www.google.com/schemas/sitemap-news/0.9}"
+XHTML_NS = "{http://www.w3.org/1999/xhtml}"
+
+SITEMAP_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+EXTENSION_XMLNS = {
+    "xmlns:xhtml": "http://www.w3.org/1999/xhtml",
+    "xmlns:image": "http://www.google.com/schemas/sitemap-image/1.1",
+    "xmlns:news": "http://www.google.com/schemas/sitemap-news/0.9",
+}
+
+# Limits from the sitemap protocol
+MAX_URLS_PER_SITEMAP = 50_000
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+DEFAULT_COMPRESS_LEVEL = 9
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Fully qualified tags used by the single-pass parser
+_URL_TAG = f"{SITEMAP_NS}url"
+_SITEMAPINDEX_TAG = f"{SITEMAP_NS}sitemapindex"
+_LOC_TAG = f"{SITEMAP_NS}loc"
+_LASTMOD_TAG = f"{SITEMAP_NS}lastmod"
+_CHANGEFREQ_TAG = f"{SITEMAP_NS}changefreq"
+_PRIORITY_TAG = f"{SITEMAP_NS}priority"
+_XHTML_LINK_TAG = f"{XHTML_NS}link"
+_IMAGE_TAG = f"{IMAGE_NS}image"
+_IMAGE_LOC_TAG = f"{IMAGE_NS}loc"
+_NEWS_TAG = f"{NEWS_NS}news"
+_NEWS_PUBLICATION_TAG = f"{NEWS_NS}publication"
+_NEWS_NAME_TAG = f"{NEWS_NS}name"
+_NEWS_LANGUAGE_TAG = f"{NEWS_NS}language"
+_NEWS_DATE_TAG = f"{NEWS_NS}publication_date"
+_NEWS_TITLE_TAG = f"{NEWS_NS}title"
+
+
+def _current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+class _AtomicFile:
+    """Temporary file next to path, swapped in with os.replace on commit().
+
+    The old file is never truncated, so readers and memory maps of it stay valid,
+    and a write that is discarded or fails leaves it untouched.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        fd, self._tmp = tempfile.mkstemp(
+            prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent
+        )
+        self.file: BinaryIO = os.fdopen(fd, "wb")
+
+    def commit(self):
+        """Sync the temporary file and move it over path"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        # mkstemp files are private, give the result the mode a plain open() would
+        os.chmod(self._tmp, 0o666 & ~_current_umask())
+        os.replace(self._tmp, self.path)
+
+    def discard(self):
+        """Drop the temporary file, leaving path as it was"""
+        self.file.close()
+        try:
+            os.unlink(self._tmp)
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def _atomic_open(path: str | Path) -> Iterator[BinaryIO]:
+    """Write to a temporary file next to path, then swap it in with os.replace"""
+    atomic = _AtomicFile(path)
+    try:
+        yield atomic.file
+        atomic.commit()
+    except BaseException:
+        atomic.discard()
+        raise
+
+
+def _open_xml(path: Path):
+    """Open an XML file for binary reading, decompressing .gz files"""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _is_index_file(path: Path) -> bool:
+    """Check whether the root element of an XML file is <sitemapindex>"""
+    with _open_xml(path) as f:
+        for _, element in DefusedElementTree.iterparse(f, events=("start",)):
+            return element.tag == _SITEMAPINDEX_TAG
+    return False
 
 
 class ImageEntry:
@@ -44,6 +155,7 @@ class URLEntry:
         self.hreflang_alts: list[HreflangAlternate] = []
         self.images: list[ImageEntry] = []
         self.news_entry: NewsEntry = None
+        self.hreflang_cluster: HreflangCluster | None = None
 
     def add_alternate(
         self, href_alt=None, hreflang: str = "", href: str = ""
@@ -78,6 +190,16 @@ class URLEntry:
 
         return self
 
+    def set_hreflang_cluster(self, cluster: "HreflangCluster") -> "URLEntry":
+        """Attach a shared hreflang cluster to URL"""
+        if not isinstance(cluster, HreflangCluster):
+            raise TypeError(
+                f"Expected HreflangCluster, received: {type(cluster).__name__}"
+            )
+        self.hreflang_cluster = cluster
+
+        return self
+
     def add_image(self, image: str | ImageEntry) -> "URLEntry":
         """Append image element to URLEntry"""
         self._add_element(image, ImageEntry)
@@ -122,9 +244,91 @@ class HreflangAlternate:
         self.href = href
 
 
+class HreflangCluster:
+    """Immutable set of hreflang alternates shared by every URL in the group.
+
+    Each member URLEntry references the same cluster instead of carrying its
+    own copy of the alternates, and the ``<xhtml:link>`` elements (or rendered
+    text, depending on the serializer) are built once and reused for every
+    member when the sitemap is written.
+    """
+
+    __slots__ = ("_alternates", "_link_elements", "_link_block")
+
+    def __init__(self, alternates: list[HreflangAlternate | dict]):
+        alts = []
+        for alt in alternates:
+            if isinstance(alt, HreflangAlternate):
+                alts.append(HreflangAlternate(hreflang=alt.hreflang, href=alt.href))
+                continue
+
+            href = alt.get("href")
+            hreflang = alt.get("hreflang")
+            if not href or not hreflang:
+                raise ValueError(
+                    f"Missing required field: {'href' if not href else 'hreflang'}"
+                )
+            alts.append(HreflangAlternate(hreflang=hreflang, href=href))
+
+        self._alternates: tuple[HreflangAlternate, ...] = tuple(alts)
+        self._link_elements: tuple[ET.Element, ...] | None = None
+        self._link_block: str | None = None
+
+    @classmethod
+    def from_dict(cls, locales: dict[str, str]) -> "HreflangCluster":
+        """Builds cluster from a mapping of hreflang code to URL"""
+        return cls(
+            [
+                HreflangAlternate(hreflang=lang, href=href)
+                for lang, href in locales.items()
+            ]
+        )
+
+    @property
+    def alternates(self) -> tuple[HreflangAlternate, ...]:
+        return self._alternates
+
+    def to_url_entries(self, **kwargs) -> list[URLEntry]:
+        """Create one URLEntry per alternate, all sharing this cluster"""
+        return [
+            URLEntry(loc=alt.href, **kwargs).set_hreflang_cluster(self)
+            for alt in self._alternates
+        ]
+
+    def _get_link_elements(self) -> tuple[ET.Element, ...]:
+        """Return the pre-built <xhtml:link> elements for this cluster"""
+        if self._link_elements is None:
+            self._link_elements = tuple(
+                ET.Element(
+                    "xhtml:link",
+                    rel="alternate",
+                    hreflang=alt.hreflang,
+                    href=alt.href,
+                )
+                for alt in self._alternates
+            )
+        return self._link_elements
+
+    def __getstate__(self):
+        # Link elements are rebuilt on demand, e.g. in a worker process
+        return self._alternates
+
+    def __setstate__(self, state):
+        self._alternates = state
+        self._link_elements = None
+        self._link_block = None
+
+    def __len__(self):
+        return len(self._alternates)
+
+    def __iter__(self):
+        return iter(self._alternates)
+
+
 class Sitemap:
-    def __init__(self):
+    def __init__(self, serializer: "str | SitemapSerializer | None" = None):
         self.urls: list[URLEntry] = []
+        self.serializer = serializer
 
     @classmethod
     def from_file(cls, path: str | Path) -> "Sitemap":
@@ -138,16 +342,86 @@ class Sitemap:
             Sitemap: instance of Sitemap
         """
         instance = cls()
+        instance.urls.extend(cls.iter_file(path))
+
+        return instance
+
+    @classmethod
+    def iter_file(cls, path: str | Path) -> Iterator[URLEntry]:
+        """
+        Stream URLEntry objects from provided XML file without loading the whole tree.
+        Files ending in .gz are decompressed on the fly.
 
+        Args:
+            path (str or Path): the filepath to the XML file
+
+        Yields:
+            URLEntry: one entry per <url> element
+        """
         path = Path(path)
 
-        et = DefusedElementTree.parse(path)
-        root = et.getroot()
-        for element in root.findall(f".//{SITEMAP_NS}url"):
-            url_entry = cls._build_url_entry(url_element=element)
-            instance.urls.append(url_entry)
+        with _open_xml(path) as f:
+            root = None
+            for event, element in DefusedElementTree.iterparse(
+                f, events=("start", "end")
+            ):
+                if root is None:
+                    root = element
+                elif event == "end" and element.tag == _URL_TAG:
+                    url_entry = cls._build_url_entry(url_element=element)
+                    # Drop parsed <url> elements to keep memory flat
+                    root.clear()
+                    if url_entry is not None:
+                        yield url_entry
 
-        return instance
+    @classmethod
+    def iter_tree(cls, path: str | Path) -> Iterator[URLEntry]:
+        """
+        Stream URLEntry objects from a sitemap or sitemap index file. Index entries are
+        resolved to files of the same name next to the index file.
+
+        Args:
+            path (str or Path): the filepath to the sitemap or sitemap index file
+
+        Yields:
+            URLEntry: one entry per <url> element across the whole tree
+        """
+        path = Path(path)
+
+        if not _is_index_file(path):
+            yield from cls.iter_file(path)
+            return
+
+        for index_entry in SitemapIndex.from_file(path):
+            child_path = path.parent / Path(urlsplit(index_entry.loc).path).name
+            if not child_path.exists():
+                raise FileNotFoundError(
+                    f"Sitemap listed in index not found on disk: {child_path}"
+                )
+            yield from cls.iter_tree(child_path)
+
+    @classmethod
+    def load_snapshot(cls, path: str | Path) -> "Sitemap":
+        """
+        Load a snapshot written by save_snapshot(). The file is memory-mapped and
+        each URL is decoded the first time it is accessed, so loading is near instant.
+
+        Args:
+            path (str or Path): the snapshot filepath
+
+        Returns:
+            Sitemap: instance of Sitemap
+        """
+        from .snapshot import load_snapshot
+
+        return load_snapshot(path)
+
+    @classmethod
+    def iter_snapshot(cls, path: str | Path) -> Iterator[URLEntry]:
+        """Stream URLEntry objects from a snapshot without keeping them in memory"""
+        from .snapshot import iter_snapshot
+
+        return iter_snapshot(path)
 
     @classmethod
     def from_list(cls, urls: list[str | URLEntry]) -> "Sitemap":
@@ -166,66 +440,71 @@ class Sitemap:
         return instance
 
     @classmethod
-    def _build_url_entry(cls, url_element: ET.Element) -> "URLEntry":
-        """Construct a URL Element"""
-        loc_element = url_element.find(f"{SITEMAP_NS}loc")
-        if loc_element is not None and loc_element.text:
-            url_entry = URLEntry(loc=loc_element.text)
-
-            lastmod_element = url_element.find(f"{SITEMAP_NS}lastmod")
-
-            if lastmod_element is not None and lastmod_element.text:
-                url_entry.lastmod = lastmod_element.text
-
-            priority_element = url_element.find(f"{SITEMAP_NS}priority")
-
-            if priority_element is not None and priority_element.text:
-                url_entry.priority = float(priority_element.text)
-
-            changefreq_element = url_element.find(f"{SITEMAP_NS}changefreq")
-
-            if changefreq_element is not None and changefreq_element.text:
-                url_entry.changefreq = changefreq_element.text
-
-            # Handle image elements
-            image_element = url_element.find(f"{IMAGE_NS}image")
-            if image_element:
-                image_entry = cls._build_image_entry(image_element)
-                url_entry.images.append(image_entry)
-
-            # Handle news elements
-            news_element = url_element.find(f"{NEWS_NS}news")
-            if news_element:
-                news_entry = cls._build_news_entry(news_element)
-                url_entry.news_entry = news_entry
+    def _build_url_entry(cls, url_element: ET.Element) -> "URLEntry | None":
+        """Construct a URL Element in a single pass over its children"""
+        url_entry = URLEntry(loc="")
+
+        for child in url_element:
+            tag = child.tag
+            text = child.text
+
+            if tag == _LOC_TAG:
+                if text:
+                    url_entry.loc = text
+            elif tag == _LASTMOD_TAG:
+                if text:
+                    url_entry.lastmod = text
+            elif tag == _CHANGEFREQ_TAG:
+                if text:
+                    url_entry.changefreq = text
+            elif tag == _PRIORITY_TAG:
+                if text:
+                    url_entry.priority = float(text)
+            elif tag == _XHTML_LINK_TAG:
+                hreflang = child.get("hreflang")
+                href = child.get("href")
+                if child.get("rel", "alternate") == "alternate" and hreflang and href:
+                    url_entry.hreflang_alts.append(
+                        HreflangAlternate(hreflang=hreflang, href=href)
+                    )
+            elif tag == _IMAGE_TAG:
+                image_entry = cls._build_image_entry(child)
+                if image_entry is not None:
+                    url_entry.images.append(image_entry)
+            elif tag == _NEWS_TAG:
+                url_entry.news_entry = cls._build_news_entry(child)
+
+        if not url_entry.loc:
+            return None
 
         return url_entry
 
     @classmethod
-    def _build_image_entry(cls, image_element: ET.Element) -> "ImageEntry":
+    def _build_image_entry(cls, image_element: ET.Element) -> "ImageEntry | None":
         """Construct an Image element"""
-        loc_element = image_element.find(f"{IMAGE_NS}loc")
-        if loc_element is not None and loc_element.text:
-            image_entry = ImageEntry(loc=loc_element.text)
+        for child in image_element:
+            if child.tag == _IMAGE_LOC_TAG and child.text:
+                return ImageEntry(loc=child.text)
 
-        return image_entry
+        return None
 
     @classmethod
     def _build_news_entry(cls, news_element: ET.Element) -> "NewsEntry":
         """Construct a News element"""
-        publication_element = news_element.find(f"{NEWS_NS}publication")
-        date_element = news_element.find(f"{NEWS_NS}publication_date")
-        title_element = news_element.find(f"{NEWS_NS}title")
-
-        name_element = publication_element.find(f"{NEWS_NS}name")
-        language_element = publication_element.find(f"{NEWS_NS}language")
-
-        news_entry = NewsEntry(
-            publication_name=name_element.text,
-            publication_language=language_element.text,
-            publication_date=date_element.text,
-            title=title_element.text,
-        )
+        news_entry = NewsEntry()
+
+        for child in news_element:
+            tag = child.tag
+            if tag == _NEWS_PUBLICATION_TAG:
+                for pub_child in child:
+                    if pub_child.tag == _NEWS_NAME_TAG:
+                        news_entry.publication_name = pub_child.text
+                    elif pub_child.tag == _NEWS_LANGUAGE_TAG:
+                        news_entry.publication_language = pub_child.text
+            elif tag == _NEWS_DATE_TAG:
+                news_entry.publication_date = child.text
+            elif tag == _NEWS_TITLE_TAG:
+                news_entry.title = child.text
 
         return news_entry
 
@@ -238,6 +517,12 @@ class Sitemap:
 
         return self
 
+    def add_hreflang_cluster(self, cluster: HreflangCluster, **kwargs) -> "Sitemap":
+        """Add a URL for every member of a hreflang cluster"""
+        self.urls.extend(cluster.to_url_entries(**kwargs))
+
+        return self
+
     def remove_url(self, url: str | URLEntry) -> "Sitemap":
         """Remove URL from sitemap"""
         if isinstance(url, str):
@@ -256,24 +541,58 @@ class Sitemap:
 
         return res
 
-    def deduplicate(self) -> "Sitemap":
-        """Removes duplicate elements by loc value"""
+    def deduplicate(
+        self, normalizer: URLNormalizer | None = None, use_digests: bool = False
+    ) -> "Sitemap":
+        """Removes duplicate elements by loc value
+
+        Args:
+            normalizer (URLNormalizer) [Optional]: compare normalized locs instead of raw strings
+            use_digests (bool): track 64-bit digests of the keys in a compact table instead
+                of the strings, at a negligible collision risk. Saves memory with a normalizer,
+                whose normalized strings would otherwise all be kept
+
+        Returns:
+            Sitemap: an instance of Sitemap
+        """
+        keys = (u.loc for u in self.urls)
+        if normalizer is not None:
+            keys = map(normalizer.normalize, keys)
 
-        seen = set()
         unique = []
-        for i in self.urls:
-            if i.loc not in seen:
-                seen.add(i.loc)
-                unique.append(i)
+        if use_digests:
+            seen = _DigestSet(len(self.urls))
+            for url, key in zip(self.urls, map(url_digest, keys)):
+                if seen.add(key):
+                    unique.append(url)
+        else:
+            seen = set()
+            for url, key in zip(self.urls, keys):
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(url)
         self.urls = unique
 
         return self
 
-    def write_to_file(self, output_filename: str = None) -> "Sitemap":
+    def normalize_urls(self, normalizer: URLNormalizer | None = None) -> "Sitemap":
+        """Rewrite every loc to its normalized form"""
+        if normalizer is None:
+            normalizer = URLNormalizer()
+
+        for url, loc in zip(
+            self.urls, normalizer.normalize_many(u.loc for u in self.urls)
+        ):
+            url.loc = loc
+
+        return self
+
+    def write_to_file(self, output_filename: str | BinaryIO = None) -> "Sitemap":
         """Write a sitemap XML file from current instance.
 
         Args:
-            output_filename (str) [Optional]: The desired name of the XML file. Default = "sitemap.xml
+            output_filename (str) [Optional]: The desired name of the XML file, or a binary
+                file-like object to write to. Default = "sitemap.xml
 
         Returns:
             sitemap: an instance of Sitemap
@@ -281,47 +600,139 @@ class Sitemap:
         if not output_filename:
             output_filename = "sitemap.xml"
 
-        urlset_attrib = self._get_required_namespaces()
-
-        root = ET.Element(
-            "urlset",
-            xmlns="http://www.sitemaps.org/schemas/sitemap/0.9",
-            attrib=urlset_attrib,
-        )
-
-        for url_entry in self.urls:
-            self._append_url_element(root=root, url_entry=url_entry)
-
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="   ")  # 3 spaces
-        tree.write(output_filename, encoding="UTF-8", xml_declaration=True)
+        _write_pieces(output_filename, self._iter_pieces())
 
         return self
 
-    def write_compressed(self, output_filename: str = None) -> "Sitemap":
+    def write_compressed(
+        self,
+        output_filename: str = None,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    ) -> "Sitemap":
         """
         Write compressed sitemap file (.xml.gz).
 
         Args:
-            output_filename: Output filename (will add .gz if not present)
+            output_filename: Output filename (will add .gz if not present), or a binary
+                file-like object to write to
+            compress_level (int): gzip compression level, 1-9. Default = 9
 
         Returns:
-            Path to created file
+            sitemap: an instance of Sitemap
         """
         if not output_filename:
             output_filename = "sitemap.xml.gz"
-        elif not output_filename.endswith(".gz"):
-            output_filename += ".gz"
+        elif not _is_file_like(output_filename) and not str(output_filename).endswith(
+            ".gz"
+        ):
+            output_filename = f"{output_filename}.gz"
+
+        _write_pieces(
+            output_filename,
+            self._iter_pieces(),
+            compress=True,
+            compress_level=compress_level,
+        )
 
-        root = ET.Element("urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
-        for url_entry in self.urls:
-            self._append_url_element(root=root, url_entry=url_entry)
+        return self
 
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="   ")
+    def to_bytes(
+        self, compress: bool = False, compress_level: int = DEFAULT_COMPRESS_LEVEL
+    ) -> bytes:
+        """Return the serialized sitemap, optionally gzip compressed"""
+        return b"".join(
+            self.iter_chunks(compress=compress, compress_level=compress_level)
+        )
 
-        with gzip.open(output_filename, "wb") as f:
-            tree.write(f, encoding="UTF-8", xml_declaration=True)
+    def iter_chunks(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        compress: bool = False,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    ) -> Iterator[bytes]:
+        """
+        Serialize the sitemap incrementally, for uploads or streamed HTTP responses.
+
+        Args:
+            chunk_size (int): size of every chunk but the last. Default = 64KB
+            compress (bool): gzip the output. Default = False
+            compress_level (int): gzip compression level, 1-9. Default = 9
+
+        Yields:
+            bytes: consecutive chunks of the XML (or .xml.gz) document
+        """
+        return _iter_fixed_chunks(
+            self._iter_pieces(), chunk_size, compress, compress_level
+        )
+
+    def write_shards(
+        self,
+        directory: str | Path,
+        base_url: str,
+        atomic: bool = False,
+        **kwargs,
+    ) -> "SitemapIndex":
+        """
+        Split the sitemap into protocol-sized files plus a sitemap index.
+
+        Args:
+            directory (str or Path): where shard and index files are written
+            base_url (str): public URL of the directory, used for index entries
+            atomic (bool): stage the files and swap the whole set in at once,
+                see AtomicShardedSitemapWriter. Default = False
+            **kwargs: passed to the writer (prefix, max_urls, compress, workers...)
+
+        Returns:
+            SitemapIndex: index listing every shard written
+        """
+        writer_class = ShardedSitemapWriter
+        if atomic:
+            from .publish import AtomicShardedSitemapWriter
+
+            writer_class = AtomicShardedSitemapWriter
+
+        with writer_class(directory, base_url, **kwargs) as writer:
+            writer.write_many(self.urls)
+
+        return writer.index
+
+    def sort(
+        self,
+        key: str | Callable[[URLEntry], object] = "loc",
+        reverse: bool = False,
+    ) -> "Sitemap":
+        """
+        Sort URLs in place. For inputs too large to hold in memory, stream them
+        through sitemapy.sort_entries() instead.
+
+        Args:
+            key (str or callable): "loc", "lastmod", "priority" or a key function. Default = "loc"
+            reverse (bool): sort descending, e.g. newest lastmod first. Default = False
+
+        Returns:
+            Sitemap: the instance, for chaining
+        """
+        from .sorting import resolve_sort_key
+
+        self.urls.sort(key=resolve_sort_key(key), reverse=reverse)
+
+        return self
+
+    def save_snapshot(self, path: str | Path) -> "Sitemap":
+        """
+        Save URLs to a compact binary snapshot for fast reloading with
+        load_snapshot(). Snapshots are a cache, not an interchange format: the
+        file format is versioned and may change between sitemapy releases.
+
+        Args:
+            path (str or Path): the snapshot filepath
+
+        Returns:
+            Sitemap: the instance, for chaining
+        """
+        from .snapshot import save_snapshot
+
+        save_snapshot(self.urls, path)
 
         return self
 
@@ -336,7 +747,13 @@ class Sitemap:
         today = datetime.now().strftime("%Y-%m-%d")
         return self.set_all_lastmod(today)
 
-    def _append_url_element(self, root: ET.Element, url_entry: URLEntry):
+    def _iter_pieces(self) -> Iterator[bytes]:
+        """Serialized <urlset> document from the configured serializer backend"""
+        serializer = _get_serializer(self.serializer)
+        return serializer.iter_urlset(self.urls, self._get_required_namespaces())
+
+    @classmethod
+    def _append_url_element(cls, root: ET.Element, url_entry: URLEntry):
         """Append URL element to given root element"""
         url_elem = ET.SubElement(root, "url")
         loc = ET.SubElement(url_elem, "loc")
@@ -355,11 +772,21 @@ class Sitemap:
             priority = ET.SubElement(url_elem, "priority")
             priority.text = str(url_entry.priority)
 
+        if url_entry.hreflang_cluster:
+            link_elements = url_entry.hreflang_cluster._get_link_elements()
+            # Shared elements are reused as-is. The final one gets a shallow
+            # copy so ET.indent can give it its own closing tail.
+            if url_entry.hreflang_alts or url_entry.images or url_entry.news_entry:
+                url_elem.extend(link_elements)
+            elif link_elements:
+                url_elem.extend(link_elements[:-1])
+                url_elem.append(copy.copy(link_elements[-1]))
+
         if url_entry.hreflang_alts:
             for alt in url_entry.hreflang_alts:
                 _ = ET.SubElement(
                     url_elem,
-                    "{http://www.w3.org/1999/xhtml}link",
+                    "xhtml:link",
                     rel="alternate",
                     hreflang=alt.hreflang,
                     href=alt.href,
@@ -367,20 +794,20 @@ class Sitemap:
 
         if url_entry.images:
             for image in url_entry.images:
-                self._append_image_element(url_elem=url_elem, image_entry=image)
+                cls._append_image_element(url_elem=url_elem, image_entry=image)
 
         if url_entry.news_entry:
-            self._append_news_element(
-                url_elem=url_elem, news_entry=url_entry.news_entry
-            )
+            cls._append_news_element(url_elem=url_elem, news_entry=url_entry.news_entry)
 
-    def _append_image_element(self, url_elem: ET.Element, image_entry: ImageEntry):
+    @classmethod
+    def _append_image_element(cls, url_elem: ET.Element, image_entry: ImageEntry):
         """Append Image element to URL element"""
         image = ET.SubElement(url_elem, "image:image")
         image_loc = ET.SubElement(image, "image:loc")
         image_loc.text = image_entry.loc
 
-    def _append_news_element(self, url_elem: ET.Element, news_entry: NewsEntry):
+    @classmethod
+    def _append_news_element(cls, url_elem: ET.Element, news_entry: NewsEntry):
         """Append News element to URL element"""
         news_parent_element = ET.SubElement(url_elem, "news:news")
 
@@ -414,12 +841,12 @@ class Sitemap:
     def _get_required_namespaces(self):
         """Return XML namespace per element type to be written to file"""
         namespaces = {}
+        if any(url.hreflang_alts or url.hreflang_cluster for url in self.urls):
+            namespaces["xmlns:xhtml"] = EXTENSION_XMLNS["xmlns:xhtml"]
         if any(url.images for url in self.urls):
-            namespaces["xmlns:image"] = (
-                "http://www.google.com/schemas/sitemap-image/1.1"
-            )
+            namespaces["xmlns:image"] = EXTENSION_XMLNS["xmlns:image"]
         if any(url.news_entry for url in self.urls):
-            namespaces["xmlns:news"] = "http://www.google.com/schemas/sitemap-news/0.9"
+            namespaces["xmlns:news"] = EXTENSION_XMLNS["xmlns:news"]
 
         return namespaces
 
@@ -430,6 +857,186 @@ class Sitemap:
         return iter(self.urls)
 
 
+def _get_serializer(serializer=None) -> "SitemapSerializer":
+    """Resolve a serializer backend by name or instance"""
+    from .serializers import get_serializer
+
+    return get_serializer(serializer)
+
+
+def _write_pieces(
+    output: str | Path | BinaryIO,
+    pieces: Iterable[bytes],
+    compress: bool = False,
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+):
+    """Write serialized pieces to a path or binary file-like object"""
+    raw = output if _is_file_like(output) else open(output, "wb")
+    try:
+        f = raw
+        if compress:
+            f = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=compress_level)
+        try:
+            for piece in pieces:
+                f.write(piece)
+        finally:
+            if f is not raw:
+                f.close()
+    finally:
+        if raw is not output:
+            raw.close()
+
+
+def _iter_fixed_chunks(
+    pieces: Iterable[bytes],
+    chunk_size: int,
+    compress: bool = False,
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+) -> Iterator[bytes]:
+    """Regroup (and optionally gzip) serialized pieces into chunk_size blocks"""
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive. received: {chunk_size}")
+
+    compressor = None
+    if compress:
+        # wbits=31 produces a gzip container, as gzip.open would
+        compressor = zlib.compressobj(compress_level, zlib.DEFLATED, 31)
+
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += compressor.compress(piece) if compressor else piece
+        if len(buffer) >= chunk_size:
+            view = memoryview(buffer)
+            offset = 0
+            while len(buffer) - offset >= chunk_size:
+                yield bytes(view[offset : offset + chunk_size])
+                offset += chunk_size
+            view.release()
+            del buffer[:offset]
+
+    if compressor:
+        buffer += compressor.flush()
+
+    for offset in range(0, len(buffer), chunk_size):
+        yield bytes(buffer[offset : offset + chunk_size])
+
+
+def _is_file_like(output) -> bool:
+    return hasattr(output, "write")
+
+
+class SitemapWriter:
+    """Stream URL entries to a sitemap file one at a time.
+
+    Unlike Sitemap.write_to_file, entries are never held in memory together, so
+    arbitrarily long iterables can be written with bounded memory. All extension
+    namespaces are declared up front since the entries are not known in advance.
+
+    Args:
+        output_filename (str, Path or binary file-like): where to write. File-like
+            objects are left open on close. Paths are written to a temporary file and
+            replaced on close, so a failed run leaves the previous file untouched
+        compress_level (int): gzip compression level. Default = 9
+        namespaces (dict) [Optional]: namespace attributes for <urlset>. Default = all extensions
+        compress (bool) [Optional]: gzip the output. Default = True for paths ending in .gz
+        serializer (str or SitemapSerializer) [Optional]: serializer backend. Default = "template"
+    """
+
+    def __init__(
+        self,
+        output_filename: str | Path | BinaryIO,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        namespaces: dict[str, str] | None = None,
+        compress: bool | None = None,
+        serializer: "str | SitemapSerializer | None" = None,
+    ):
+        self.serializer = _get_serializer(serializer)
+        self.url_count = 0
+        self.bytes_written = 0
+
+        if _is_file_like(output_filename):
+            self.output_filename = None
+            self._atomic = None
+            self._raw = output_filename
+        else:
+            self.output_filename = Path(output_filename)
+            self._atomic = _AtomicFile(self.output_filename)
+            self._raw = self._atomic.file
+
+        if compress is None:
+            compress = (
+                self.output_filename is not None
+                and self.output_filename.suffix == ".gz"
+            )
+
+        self._file = self._raw
+        if compress:
+            self._file = gzip.GzipFile(
+                fileobj=self._raw, mode="wb", compresslevel=compress_level
+            )
+
+        self._write_chunk(
+            self.serializer.urlset_header(
+                EXTENSION_XMLNS if namespaces is None else namespaces
+            )
+        )
+
+    def write(self, url_entry: str | URLEntry) -> "SitemapWriter":
+        """Write a single URL entry"""
+        if isinstance(url_entry, str):
+            url_entry = URLEntry(loc=url_entry)
+
+        self._write_chunk(self.serializer.url(url_entry))
+        self.url_count += 1
+
+        return self
+
+    def write_many(self, url_entries: Iterable[str | URLEntry]) -> "SitemapWriter":
+        """Write every URL entry from an iterable"""
+        for url_entry in url_entries:
+            self.write(url_entry)
+
+        return self
+
+    def close(self):
+        """Write the closing tag and close the file"""
+        if self._file is None:
+            return
+
+        self._write_chunk(self.serializer.urlset_footer)
+        if self._file is not self._raw:
+            self._file.close()
+        if self._atomic is not None:
+            self._atomic.commit()
+        self._file = None
+        self._raw = None
+
+    def _abort(self):
+        """Release the file without the closing tag. Paths keep their previous contents"""
+        if self._file is None:
+            return
+
+        if self._file is not self._raw:
+            self._file.close()
+        if self._atomic is not None:
+            self._atomic.discard()
+        self._file = None
+        self._raw = None
+
+    def _write_chunk(self, chunk: bytes):
+        self._file.write(chunk)
+        self.bytes_written += len(chunk)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+
+
 class IndexEntry:
     def __init__(self, loc: str, lastmod: str = None):
         self.loc: str = loc
@@ -437,8 +1044,9 @@ class IndexEntry:
 
 
 class SitemapIndex:
-    def __init__(self):
+    def __init__(self, serializer: "str | SitemapSerializer | None" = None):
         self.index_entries: list[IndexEntry] = []
+        self.serializer = serializer
 
     @classmethod
     def from_file(cls, path: str | Path) -> "SitemapIndex":
@@ -455,8 +1063,8 @@ class SitemapIndex:
 
         path = Path(path)
 
-        et = DefusedElementTree.parse(path)
-        root = et.getroot()
+        with _open_xml(path) as f:
+            root = DefusedElementTree.parse(f).getroot()
         for element in root.findall(f".//{SITEMAP_NS}sitemap"):
             loc_element = element.find(f"{SITEMAP_NS}loc")
             if loc_element is not None and loc_element.text:
@@ -502,11 +1110,12 @@ class SitemapIndex:
 
         return self
 
-    def write_to_file(self, output_filename: str = None) -> "SitemapIndex":
+    def write_to_file(self, output_filename: str | BinaryIO = None) -> "SitemapIndex":
         """Write a sitemap index XML file from current instance.
 
         Args:
-            output_filename (str) [Optional]: The desired name of the XML file. Default = "sitemap-index.xml
+            output_filename (str) [Optional]: The desired name of the XML file, or a binary
+                file-like object to write to. Default = "sitemap-index.xml
 
         Returns:
             sitemap: an instance of SitemapIndex
@@ -514,20 +1123,46 @@ class SitemapIndex:
         if not output_filename:
             output_filename = "sitemap-index.xml"
 
-        root = ET.Element(
-            "sitemapindex", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        _write_pieces(output_filename, self._iter_pieces())
+
+        return self
+
+    def to_bytes(
+        self, compress: bool = False, compress_level: int = DEFAULT_COMPRESS_LEVEL
+    ) -> bytes:
+        """Return the serialized sitemap index, optionally gzip compressed"""
+        return b"".join(
+            self.iter_chunks(compress=compress, compress_level=compress_level)
         )
 
-        for sitemap in self.index_entries:
-            self._append_sitemap_element(root=root, index_entry=sitemap)
+    def iter_chunks(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        compress: bool = False,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    ) -> Iterator[bytes]:
+        """
+        Serialize the sitemap index incrementally.
 
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="   ")  # 3 spaces
-        tree.write(output_filename, encoding="UTF-8", xml_declaration=True)
+        Args:
+            chunk_size (int): size of every chunk but the last. Default = 64KB
+            compress (bool): gzip the output. Default = False
+            compress_level (int): gzip compression level, 1-9. Default = 9
 
-        return self
+        Yields:
+            bytes: consecutive chunks of the XML (or .xml.gz) document
+        """
+        return _iter_fixed_chunks(
+            self._iter_pieces(), chunk_size, compress, compress_level
+        )
+
+    def _iter_pieces(self) -> Iterator[bytes]:
+        """Serialized <sitemapindex> document from the configured serializer backend"""
+        serializer = _get_serializer(self.serializer)
+        return serializer.iter_sitemapindex(self.index_entries)
 
-    def _append_sitemap_element(self, root: ET.Element, index_entry: IndexEntry):
+    @classmethod
+    def _append_sitemap_element(cls, root: ET.Element, index_entry: IndexEntry):
         """Append Sitemap element to given root element"""
         sitemap_element = ET.SubElement(root, "sitemap")
         loc = ET.SubElement(sitemap_element, "loc")
@@ -543,3 +1178,269 @@ class SitemapIndex:
 
     def __iter__(self):
         return iter(self.index_entries)
+
+
+def _latest_lastmod(url_entries: Iterable[URLEntry]) -> str | None:
+    """Most recent lastmod of a group of entries, used for index entries"""
+    return max((u.lastmod for u in url_entries if u.lastmod), default=None)
+
+
+def _render_shard(
+    url_entries: list[URLEntry],
+    compress: bool,
+    compress_level: int,
+    max_bytes: int,
+    serializer: "SitemapSerializer",
+) -> bytes:
+    """Serialize one complete shard. Runs in a worker process for parallel writes"""
+    size = 0
+
+    def pieces():
+        nonlocal size
+        for piece in serializer.iter_urlset(url_entries, EXTENSION_XMLNS):
+            size += len(piece)
+            yield piece
+
+    data = b"".join(
+        _iter_fixed_chunks(pieces(), DEFAULT_CHUNK_SIZE, compress, compress_level)
+    )
+    if size > max_bytes:
+        raise ValueError(
+            f"Shard of {len(url_entries)} URLs is {size} bytes uncompressed, over the "
+            f"{max_bytes} byte limit. Lower max_urls."
+        )
+
+    return data
+
+
+class ShardedSitemapWriter:
+    """Stream URL entries into numbered sitemap files plus a sitemap index.
+
+    A new shard is started whenever the current one reaches max_urls entries or
+    would exceed max_bytes uncompressed. With workers > 1, complete shards are
+    serialized and compressed in a process pool. Memory then stays bounded by
+    roughly (2 * workers + 1) * max_urls entries, and shards are split by
+    max_urls only. A shard over max_bytes raises ValueError.
+
+    Args:
+        directory (str or Path): where shard and index files are written
+        base_url (str): public URL of the directory, used for index entries
+        prefix (str): shard filename prefix. Default = "sitemap"
+        max_urls (int): URLs per shard. Default = 50,000
+        max_bytes (int): uncompressed bytes per shard. Default = 50MB
+        compress (bool): write .xml.gz shards. Default = True
+        compress_level (int): gzip compression level, 1-9. Default = 9
+        workers (int): processes used to write shards. Default = 1
+        index_filename (str) [Optional]: index file written on close. Default = "{prefix}-index.xml"
+        opener (callable) [Optional]: called with each shard and index filename, returns a
+            binary file-like object to write to instead of a file in directory. The
+            object is closed once its file is complete
+        serializer (str or SitemapSerializer) [Optional]: serializer backend. Default = "template"
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        base_url: str,
+        prefix: str = "sitemap",
+        max_urls: int = MAX_URLS_PER_SITEMAP,
+        max_bytes: int = MAX_SITEMAP_BYTES,
+        compress: bool = True,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        workers: int = 1,
+        index_filename: str | None = None,
+        opener: Callable[[str], BinaryIO] | None = None,
+        serializer: "str | SitemapSerializer | None" = None,
+    ):
+        if max_urls <= 0:
+            raise ValueError(f"max_urls must be positive. received: {max_urls}")
+        if directory is None and opener is None:
+            raise ValueError("Either directory or opener is required")
+
+        self.directory = Path(directory) if directory is not None else None
+        self.opener = opener
+        if opener is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.prefix = prefix
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.compress_level = compress_level
+        self.workers = workers
+        self.index_filename = index_filename or f"{prefix}-index.xml"
+        self.serializer = _get_serializer(serializer)
+        self.index = SitemapIndex(serializer=self.serializer)
+        self.url_count = 0
+
+        self._suffix = ".xml.gz" if compress else ".xml"
+        self._writer: SitemapWriter | None = None
+        self._shard_name: str | None = None
+        self._shard_file: BinaryIO | None = None
+        self._lastmod: str | None = None
+        self._buffer: list[URLEntry] = []
+        self._pending = deque()
+        self._executor = None
+        if workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.index)
+
+    def write(self, url_entry: str | URLEntry) -> "ShardedSitemapWriter":
+        """Write a single URL entry, starting a new shard when needed"""
+        if isinstance(url_entry, str):
+            url_entry = URLEntry(loc=url_entry)
+
+        if self._executor is not None:
+            self._buffer.append(url_entry)
+            if len(self._buffer) >= self.max_urls:
+                self._submit_buffer()
+        else:
+            self._write_serial(url_entry)
+
+        self.url_count += 1
+
+        return self
+
+    def write_many(
+        self, url_entries: Iterable[str | URLEntry]
+    ) -> "ShardedSitemapWriter":
+        """Write every URL entry from an iterable"""
+        for url_entry in url_entries:
+            self.write(url_entry)
+
+        return self
+
+    def close(self) -> SitemapIndex:
+        """Finish the last shard, wait for workers and write the index file"""
+        if self._executor is not None:
+            try:
+                if self._buffer:
+                    self._submit_buffer()
+                while self._pending:
+                    self._flush_oldest()
+            finally:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+        else:
+            self._finish_shard()
+
+        if self.index_filename:
+            if self.opener is not None:
+                f = self.opener(self.index_filename)
+                try:
+                    self.index.write_to_file(f)
+                finally:
+                    f.close()
+            else:
+                self.index.write_to_file(str(self.directory / self.index_filename))
+
+        return self.index
+
+    def _write_serial(self, url_entry: URLEntry):
+        chunk = self.serializer.url(url_entry)
+        limit = self.max_bytes - len(self.serializer.urlset_footer)
+
+        writer = self._writer
+        if writer is not None and (
+            writer.url_count >= self.max_urls
+            or writer.bytes_written + len(chunk) > limit
+        ):
+            self._finish_shard()
+            writer = None
+
+        if writer is None:
+            self._shard_name = self._next_shard_name()
+            if self.opener is not None:
+                self._shard_file = self.opener(self._shard_name)
+                output = self._shard_file
+            else:
+                output = self.directory / self._shard_name
+            writer = self._writer = SitemapWriter(
+                output,
+                compress_level=self.compress_level,
+                compress=self.compress,
+                serializer=self.serializer,
+            )
+            if writer.bytes_written + len(chunk) > limit:
+                raise ValueError(
+                    f"URL entry for {url_entry.loc} does not fit in a "
+                    f"{self.max_bytes} byte sitemap"
+                )
+
+        writer._write_chunk(chunk)
+        writer.url_count += 1
+        if url_entry.lastmod and (
+            self._lastmod is None or url_entry.lastmod > self._lastmod
+        ):
+            self._lastmod = url_entry.lastmod
+
+    def _finish_shard(self):
+        if self._writer is None:
+            return
+
+        self._writer.close()
+        if self._shard_file is not None:
+            self._shard_file.close()
+            self._shard_file = None
+        self._add_index_entry(self._shard_name, self._lastmod)
+        self._writer = None
+        self._lastmod = None
+
+    def _submit_buffer(self):
+        # Keep at most 2 shards per worker in flight to bound memory
+        while len(self._pending) >= 2 * self.workers:
+            self._flush_oldest()
+
+        entries, self._buffer = self._buffer, []
+        name = self._next_shard_name()
+        future = self._executor.submit(
+            _render_shard,
+            entries,
+            self.compress,
+            self.compress_level,
+            self.max_bytes,
+            self.serializer,
+        )
+        self._pending.append((name, future))
+        self._add_index_entry(name, _latest_lastmod(entries))
+
+    def _flush_oldest(self):
+        """Write the oldest rendered shard to its destination"""
+        name, future = self._pending.popleft()
+        data = future.result()
+        if self.opener is not None:
+            f = self.opener(name)
+        else:
+            f = open(self.directory / name, "wb")
+        with f:
+            f.write(data)
+
+    def _next_shard_name(self) -> str:
+        return f"{self.prefix}-{self.shard_count + 1}{self._suffix}"
+
+    def _add_index_entry(self, name: str, lastmod: str | None):
+        self.index.add_sitemap(f"{self.base_url}{name}", lastmod=lastmod)
+
+    def _abort(self):
+        """Release files and workers without writing the index"""
+        if self._writer is not None:
+            self._writer._abort()
+            self._writer = None
+        if self._shard_file is not None:
+            self._shard_file.close()
+            self._shard_file = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
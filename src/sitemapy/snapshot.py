@@ -0,0 +1,470 @@
+from array import array
+from collections.abc import MutableSequence
+from datetime import date
+import mmap
+from pathlib import Path
+import re
+import struct
+import sys
+from typing import Iterable, Iterator
+
+from .sitemapy import (
+    HreflangAlternate,
+    HreflangCluster,
+    ImageEntry,
+    NewsEntry,
+    Sitemap,
+    URLEntry,
+    _atomic_open,
+)
+
+# magic, format version, URL count, string count, cluster count, changefreq count,
+# record index offset, string index offset, cluster index offset, changefreq offset
+_HEADER = struct.Struct("<4sB3xQQQQQQQQ")
+_MAGIC = b"SMSS"
+_VERSION = 1
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_F64 = struct.Struct("<d")
+_PAIR = struct.Struct("<II")
+_SPAN = struct.Struct("<QQ")
+# loc string, field flags
+_RECORD = struct.Struct("<IH")
+
+# Record field flags, fields follow the fixed part in this order
+_LASTMOD_DAYS = 1 << 0  # u32 date ordinal, for plain YYYY-MM-DD dates
+_LASTMOD_STR = 1 << 1  # u32 string
+_CHANGEFREQ = 1 << 2  # u8 changefreq table index
+_CHANGEFREQ_STR = 1 << 3  # u32 string, once the table is full
+_PRIORITY_MILLI = 1 << 4  # u16 priority * 1000
+_PRIORITY_F64 = 1 << 5  # f64 priority
+_CLUSTER = 1 << 6  # u32 cluster
+_ALTERNATES = 1 << 7  # u16 count, then (hreflang, href) u32 string pairs
+_IMAGES = 1 << 8  # u16 count, then u32 strings
+_NEWS = 1 << 9  # u8 field flags, then a u32 string per field present
+
+_NEWS_FIELDS = ("publication_name", "publication_language", "publication_date", "title")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _align(offset: int) -> int:
+    return offset + (-offset % 8)
+
+
+class _SnapshotWriter:
+    """Encodes entries into records, interning strings, clusters and changefreqs"""
+
+    def __init__(self):
+        self.strings: dict[str, int] = {}
+        # id -> (index, cluster). Holding the cluster keeps its id from being reused
+        self.clusters: dict[int, tuple[int, HreflangCluster]] = {}
+        self.cluster_records: list[bytes] = []
+        self.changefreqs: dict[str, int] = {}
+
+    def string(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def cluster(self, cluster: HreflangCluster) -> int:
+        known = self.clusters.get(id(cluster))
+        if known is not None:
+            return known[0]
+
+        index = len(self.cluster_records)
+        self.clusters[id(cluster)] = (index, cluster)
+        self.cluster_records.append(self._alternates(cluster.alternates))
+        return index
+
+    def _alternates(self, alternates) -> bytes:
+        string = self.string
+        return _U16.pack(len(alternates)) + b"".join(
+            _PAIR.pack(string(alt.hreflang), string(alt.href)) for alt in alternates
+        )
+
+    def record(self, url_entry: URLEntry) -> bytes:
+        string = self.string
+        flags = 0
+        parts = []
+
+        lastmod = url_entry.lastmod
+        if lastmod is not None:
+            days = _date_ordinal(lastmod)
+            if days is not None:
+                flags |= _LASTMOD_DAYS
+                parts.append(_U32.pack(days))
+            else:
+                flags |= _LASTMOD_STR
+                parts.append(_U32.pack(string(lastmod)))
+
+        changefreq = url_entry.changefreq
+        if changefreq is not None:
+            code = self.changefreqs.get(changefreq)
+            if code is None and len(self.changefreqs) < 256:
+                code = self.changefreqs[changefreq] = len(self.changefreqs)
+                string(changefreq)
+            if code is not None:
+                flags |= _CHANGEFREQ
+                parts.append(_U8.pack(code))
+            else:
+                flags |= _CHANGEFREQ_STR
+                parts.append(_U32.pack(string(changefreq)))
+
+        priority = url_entry.priority
+        if priority is not None:
+            milli = round(priority * 1000)
+            if 0 <= milli <= 0xFFFF and milli / 1000 == priority:
+                flags |= _PRIORITY_MILLI
+                parts.append(_U16.pack(milli))
+            else:
+                flags |= _PRIORITY_F64
+                parts.append(_F64.pack(priority))
+
+        if url_entry.hreflang_cluster is not None:
+            flags |= _CLUSTER
+            parts.append(_U32.pack(self.cluster(url_entry.hreflang_cluster)))
+
+        if url_entry.hreflang_alts:
+            flags |= _ALTERNATES
+            parts.append(self._alternates(url_entry.hreflang_alts))
+
+        if url_entry.images:
+            flags |= _IMAGES
+            parts.append(_U16.pack(len(url_entry.images)))
+            parts.extend(_U32.pack(string(image.loc)) for image in url_entry.images)
+
+        news_entry = url_entry.news_entry
+        if news_entry is not None:
+            flags |= _NEWS
+            news_flags = 0
+            news_parts = []
+            for bit, field in enumerate(_NEWS_FIELDS):
+                value = getattr(news_entry, field)
+                if value is not None:
+                    news_flags |= 1 << bit
+                    news_parts.append(_U32.pack(string(value)))
+            parts.append(_U8.pack(news_flags))
+            parts.extend(news_parts)
+
+        return _RECORD.pack(string(url_entry.loc), flags) + b"".join(parts)
+
+
+def save_snapshot(url_entries: Iterable[URLEntry], path: str | Path) -> int:
+    """
+    Write URL entries to a binary snapshot file for load_snapshot(). The file is
+    written next to path and swapped in, so a Sitemap loaded from path can be
+    saved back to it.
+
+    Args:
+        url_entries (iterable): URLEntry objects, e.g. a Sitemap or Sitemap.iter_tree()
+        path (str or Path): the snapshot filepath
+
+    Returns:
+        int: number of URLs written
+    """
+    writer = _SnapshotWriter()
+    record_offsets = array("Q")
+
+    with _atomic_open(path) as f:
+        f.write(bytes(_HEADER.size))
+        offset = _HEADER.size
+        for url_entry in url_entries:
+            record = writer.record(url_entry)
+            record_offsets.append(offset)
+            f.write(record)
+            offset += len(record)
+        record_offsets.append(offset)
+
+        def section(data: bytes) -> int:
+            nonlocal offset
+            start = _align(offset)
+            f.write(bytes(start - offset))
+            f.write(data)
+            offset = start + len(data)
+            return start
+
+        record_index = section(_pack_u64(record_offsets))
+
+        blob = [s.encode("utf-8") for s in writer.strings]
+        string_index = section(_pack_u64(_cumulative(blob)) + b"".join(blob))
+
+        cluster_index = section(
+            _pack_u64(_cumulative(writer.cluster_records))
+            + b"".join(writer.cluster_records)
+        )
+
+        changefreq_index = section(
+            b"".join(_U32.pack(writer.string(c)) for c in writer.changefreqs)
+        )
+
+        f.seek(0)
+        f.write(
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                len(record_offsets) - 1,
+                len(writer.strings),
+                len(writer.cluster_records),
+                len(writer.changefreqs),
+                record_index,
+                string_index,
+                cluster_index,
+                changefreq_index,
+            )
+        )
+
+    return len(record_offsets) - 1
+
+
+def _date_ordinal(value: str) -> int | None:
+    """Day number of a plain YYYY-MM-DD date, None for anything else"""
+    if not _DATE.fullmatch(value):
+        return None
+    try:
+        return date.fromisoformat(value).toordinal()
+    except ValueError:
+        return None
+
+
+def _cumulative(parts: list[bytes]) -> array:
+    offsets = array("Q", [0])
+    total = 0
+    for part in parts:
+        total += len(part)
+        offsets.append(total)
+    return offsets
+
+
+def _pack_u64(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array("Q", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _SnapshotReader:
+    """Decodes entries from a memory-mapped snapshot on demand"""
+
+    def __init__(self, path: str | Path):
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise ValueError(f"Not a sitemapy snapshot file: {path}") from None
+
+        buf = self._mmap
+        if len(buf) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Not a sitemapy snapshot file: {path}")
+        (
+            magic,
+            version,
+            self.url_count,
+            string_count,
+            cluster_count,
+            changefreq_count,
+            self._record_index,
+            self._string_index,
+            self._cluster_index,
+            changefreq_index,
+        ) = _HEADER.unpack_from(buf)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"Not a sitemapy snapshot file: {path}")
+        if version != _VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        if len(buf) < changefreq_index + 4 * changefreq_count:
+            self.close()
+            raise ValueError(f"Truncated snapshot file: {path}")
+
+        self._string_blob = self._string_index + 8 * (string_count + 1)
+        self._cluster_blob = self._cluster_index + 8 * (cluster_count + 1)
+        self._clusters: dict[int, HreflangCluster] = {}
+        self._changefreqs = [
+            self.string(_U32.unpack_from(buf, changefreq_index + 4 * i)[0])
+            for i in range(changefreq_count)
+        ]
+
+    def close(self):
+        self._mmap.close()
+
+    def string(self, index: int) -> str:
+        start, end = _SPAN.unpack_from(self._mmap, self._string_index + 8 * index)
+        blob = self._string_blob
+        return self._mmap[blob + start : blob + end].decode("utf-8")
+
+    def cluster(self, index: int) -> HreflangCluster:
+        cluster = self._clusters.get(index)
+        if cluster is None:
+            (start,) = _U64.unpack_from(self._mmap, self._cluster_index + 8 * index)
+            alternates, _ = self._alternates(self._cluster_blob + start)
+            cluster = self._clusters[index] = HreflangCluster(alternates)
+        return cluster
+
+    def _alternates(self, pos: int) -> tuple[list[HreflangAlternate], int]:
+        buf = self._mmap
+        string = self.string
+        (count,) = _U16.unpack_from(buf, pos)
+        pos += 2
+        alternates = []
+        for _ in range(count):
+            hreflang, href = _PAIR.unpack_from(buf, pos)
+            pos += 8
+            alternates.append(HreflangAlternate(string(hreflang), string(href)))
+        return alternates, pos
+
+    def entry(self, index: int) -> URLEntry:
+        buf = self._mmap
+        string = self.string
+        (pos,) = _U64.unpack_from(buf, self._record_index + 8 * index)
+        loc, flags = _RECORD.unpack_from(buf, pos)
+        pos += _RECORD.size
+        url_entry = URLEntry(loc=string(loc))
+
+        if flags & _LASTMOD_DAYS:
+            (days,) = _U32.unpack_from(buf, pos)
+            pos += 4
+            url_entry.lastmod = date.fromordinal(days).isoformat()
+        elif flags & _LASTMOD_STR:
+            (value,) = _U32.unpack_from(buf, pos)
+            pos += 4
+            url_entry.lastmod = string(value)
+
+        if flags & _CHANGEFREQ:
+            url_entry.changefreq = self._changefreqs[buf[pos]]
+            pos += 1
+        elif flags & _CHANGEFREQ_STR:
+            (value,) = _U32.unpack_from(buf, pos)
+            pos += 4
+            url_entry.changefreq = string(value)
+
+        if flags & _PRIORITY_MILLI:
+            (milli,) = _U16.unpack_from(buf, pos)
+            pos += 2
+            url_entry.priority = milli / 1000
+        elif flags & _PRIORITY_F64:
+            (url_entry.priority,) = _F64.unpack_from(buf, pos)
+            pos += 8
+
+        if flags & _CLUSTER:
+            (value,) = _U32.unpack_from(buf, pos)
+            pos += 4
+            url_entry.hreflang_cluster = self.cluster(value)
+
+        if flags & _ALTERNATES:
+            url_entry.hreflang_alts, pos = self._alternates(pos)
+
+        if flags & _IMAGES:
+            (count,) = _U16.unpack_from(buf, pos)
+            pos += 2
+            for value in struct.unpack_from(f"<{count}I", buf, pos):
+                url_entry.images.append(ImageEntry(string(value)))
+            pos += 4 * count
+
+        if flags & _NEWS:
+            news_flags = buf[pos]
+            pos += 1
+            news_entry = NewsEntry()
+            for bit, field in enumerate(_NEWS_FIELDS):
+                if news_flags & (1 << bit):
+                    (value,) = _U32.unpack_from(buf, pos)
+                    pos += 4
+                    setattr(news_entry, field, string(value))
+            url_entry.news_entry = news_entry
+
+        return url_entry
+
+
+class _SnapshotURLList(MutableSequence):
+    """List of URLEntry objects decoded from a snapshot as they are accessed.
+
+    Decoded entries are kept, so changes to them stick. The first structural
+    change (append, insert, delete, sort...) decodes the remaining entries
+    into a plain list and releases the memory map.
+    """
+
+    def __init__(self, reader: _SnapshotReader):
+        self._reader = reader
+        self._decoded: list[URLEntry | None] | None = [None] * reader.url_count
+        self._list: list[URLEntry] | None = None
+
+    def __len__(self):
+        if self._list is not None:
+            return len(self._list)
+        return len(self._decoded)
+
+    def __getitem__(self, index):
+        if self._list is not None:
+            return self._list[index]
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(len(self._decoded)))]
+        if index < 0:
+            index += len(self._decoded)
+        if not 0 <= index < len(self._decoded):
+            raise IndexError("list index out of range")
+        return self._entry(index)
+
+    def _entry(self, index: int) -> URLEntry:
+        url_entry = self._decoded[index]
+        if url_entry is None:
+            url_entry = self._decoded[index] = self._reader.entry(index)
+        return url_entry
+
+    def __iter__(self):
+        if self._list is not None:
+            return iter(self._list)
+        return (self._entry(i) for i in range(len(self._decoded)))
+
+    def _materialize(self) -> list[URLEntry]:
+        if self._list is None:
+            self._list = [self._entry(i) for i in range(len(self._decoded))]
+            self._decoded = None
+            self._reader.close()
+        return self._list
+
+    def __setitem__(self, index, value):
+        self._materialize()[index] = value
+
+    def __delitem__(self, index):
+        del self._materialize()[index]
+
+    def insert(self, index, value):
+        self._materialize().insert(index, value)
+
+    def sort(self, *, key=None, reverse=False):
+        self._materialize().sort(key=key, reverse=reverse)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {len(self)} URLs>"
+
+
+def load_snapshot(path: str | Path) -> Sitemap:
+    """
+    Memory-map a snapshot written by save_snapshot(). Loading only reads the
+    header, and each entry is decoded the first time it is accessed.
+
+    Args:
+        path (str or Path): the snapshot filepath
+
+    Returns:
+        Sitemap: instance of Sitemap
+    """
+    instance = Sitemap()
+    instance.urls = _SnapshotURLList(_SnapshotReader(path))
+
+    return instance
+
+
+def iter_snapshot(path: str | Path) -> Iterator[URLEntry]:
+    """Stream every URLEntry from a snapshot without keeping them"""
+    reader = _SnapshotReader(path)
+    try:
+        for index in range(reader.url_count):
+            yield reader.entry(index)
+    finally:
+        reader.close()
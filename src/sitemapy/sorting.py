@@ -0,0 +1,185 @@
+import heapq
+from itertools import islice
+import pickle
+import tempfile
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator
+
+from .sitemapy import HreflangCluster, URLEntry
+
+DEFAULT_RUN_SIZE = 100_000
+# Runs merged at once. Once this many runs of one size exist they are merged
+# into a single larger run, so each entry is rewritten once per level of merging
+MAX_OPEN_RUNS = 64
+# Entries pickled together in a run file
+_RUN_BATCH_SIZE = 1024
+
+
+def _loc_key(url_entry: URLEntry) -> str:
+    return url_entry.loc
+
+
+def _lastmod_key(url_entry: URLEntry) -> str:
+    # W3C datetimes in one format and timezone compare correctly as strings
+    return url_entry.lastmod or ""
+
+
+def _priority_key(url_entry: URLEntry) -> float:
+    return -1.0 if url_entry.priority is None else url_entry.priority
+
+
+SORT_KEYS: dict[str, Callable[[URLEntry], object]] = {
+    "loc": _loc_key,
+    "lastmod": _lastmod_key,
+    "priority": _priority_key,
+}
+
+
+def resolve_sort_key(
+    key: str | Callable[[URLEntry], object],
+) -> Callable[[URLEntry], object]:
+    """Sort key function for a key name ("loc", "lastmod", "priority") or callable"""
+    if callable(key):
+        return key
+    try:
+        return SORT_KEYS[key]
+    except KeyError:
+        raise ValueError(
+            f"Unknown sort key: {key}. Available: {', '.join(SORT_KEYS)}"
+        ) from None
+
+
+def sort_entries(
+    url_entries: Iterable[str | URLEntry],
+    key: str | Callable[[URLEntry], object] = "loc",
+    reverse: bool = False,
+    run_size: int = DEFAULT_RUN_SIZE,
+    tmp_dir: str | Path | None = None,
+) -> Iterator[URLEntry]:
+    """
+    Sort URL entries with bounded memory.
+
+    Inputs of up to run_size entries are sorted in memory. Larger inputs are
+    cut into sorted runs of run_size entries, spilled to temporary files and
+    k-way merged, so at most one run is held in memory at a time. The sort is
+    stable and the temporary files are removed once the result is consumed.
+    Entries without lastmod or priority sort first, or last when reversed.
+
+    Args:
+        url_entries (iterable): URL strings or URLEntry objects, e.g. Sitemap.iter_tree()
+        key (str or callable): "loc", "lastmod", "priority" or a key function. Default = "loc"
+        reverse (bool): sort descending, e.g. newest lastmod first. Default = False
+        run_size (int): entries sorted in memory per run. Default = 100,000
+        tmp_dir (str or Path) [Optional]: directory for the temporary run files
+
+    Returns:
+        Iterator[URLEntry]: the sorted entries, ready for ShardedSitemapWriter.write_many()
+    """
+    if run_size <= 0:
+        raise ValueError(f"run_size must be positive. received: {run_size}")
+
+    key = resolve_sort_key(key)
+    entries = (URLEntry(loc=u) if isinstance(u, str) else u for u in url_entries)
+
+    batch = list(islice(entries, run_size))
+    batch.sort(key=key, reverse=reverse)
+    if len(batch) < run_size:
+        yield from batch
+        return
+
+    # Clusters stay in memory and are shared again when runs are read back
+    clusters: dict[int, HreflangCluster] = {}
+    # (level, run), oldest first. Levels never increase along the list, and
+    # merging only ever replaces the newest runs, which keeps the sort stable
+    runs: list[tuple[int, IO[bytes]]] = []
+    try:
+        while batch:
+            runs.append((0, _write_run(batch, clusters, tmp_dir)))
+            while len(runs) >= MAX_OPEN_RUNS and runs[-MAX_OPEN_RUNS][0] == runs[-1][0]:
+                _merge_newest(runs, MAX_OPEN_RUNS, key, reverse, clusters, tmp_dir)
+
+            batch = list(islice(entries, run_size))
+            batch.sort(key=key, reverse=reverse)
+
+        while len(runs) > MAX_OPEN_RUNS:
+            _merge_newest(runs, MAX_OPEN_RUNS, key, reverse, clusters, tmp_dir)
+
+        yield from heapq.merge(
+            *(_read_run(run, clusters) for _, run in runs), key=key, reverse=reverse
+        )
+    finally:
+        for _, run in runs:
+            run.close()
+
+
+def _merge_newest(
+    runs: list[tuple[int, IO[bytes]]],
+    count: int,
+    key: Callable[[URLEntry], object],
+    reverse: bool,
+    clusters: dict[int, HreflangCluster],
+    tmp_dir: str | Path | None,
+):
+    """Replace the newest count runs with one run, a level above the oldest of them"""
+    newest = runs[-count:]
+    merged = heapq.merge(
+        *(_read_run(run, clusters) for _, run in newest), key=key, reverse=reverse
+    )
+    merged_run = _write_run(merged, clusters, tmp_dir)
+    for _, run in newest:
+        run.close()
+    runs[-count:] = [(newest[0][0] + 1, merged_run)]
+
+
+class _RunPickler(pickle.Pickler):
+    def __init__(self, file: IO[bytes], clusters: dict[int, HreflangCluster]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.clusters = clusters
+
+    def persistent_id(self, obj):
+        if type(obj) is HreflangCluster:
+            self.clusters[id(obj)] = obj
+            return id(obj)
+        return None
+
+
+class _RunUnpickler(pickle.Unpickler):
+    def __init__(self, file: IO[bytes], clusters: dict[int, HreflangCluster]):
+        super().__init__(file)
+        self.clusters = clusters
+
+    def persistent_load(self, pid):
+        return self.clusters[pid]
+
+
+def _write_run(
+    url_entries: Iterable[URLEntry],
+    clusters: dict[int, HreflangCluster],
+    tmp_dir: str | Path | None,
+) -> IO[bytes]:
+    """Pickle sorted entries to an anonymous temporary file, in batches"""
+    run = tempfile.TemporaryFile(dir=tmp_dir)
+    try:
+        pickler = _RunPickler(run, clusters)
+        entries = iter(url_entries)
+        while batch := list(islice(entries, _RUN_BATCH_SIZE)):
+            pickler.dump(batch)
+            pickler.clear_memo()
+        run.seek(0)
+    except BaseException:
+        run.close()
+        raise
+
+    return run
+
+
+def _read_run(
+    run: IO[bytes], clusters: dict[int, HreflangCluster]
+) -> Iterator[URLEntry]:
+    unpickler = _RunUnpickler(run, clusters)
+    while True:
+        try:
+            batch = unpickler.load()
+        except EOFError:
+            return
+        yield from batch
@@ -0,0 +1,108 @@
+from pytest import fixture, raises
+
+from sitemapy import BloomFilter, Sitemap, SitemapIndex, URLNormalizer
+
+
+@fixture
+def urls():
+    return [f"https://www.example.com/page-{i}/" for i in range(500)]
+
+
+@fixture
+def sitemap_tree(tmp_path, urls):
+    """Index file pointing at one plain and one compressed sitemap"""
+    Sitemap.from_list(urls[:250]).write_to_file(str(tmp_path / "sitemap-1.xml"))
+    Sitemap.from_list(urls[250:]).write_compressed(str(tmp_path / "sitemap-2.xml.gz"))
+    SitemapIndex.from_list(
+        [
+            "https://www.example.com/sitemap-1.xml",
+            "https://www.example.com/sitemap-2.xml.gz",
+        ]
+    ).write_to_file(str(tmp_path / "sitemap-index.xml"))
+
+    return tmp_path / "sitemap-index.xml"
+
+
+def test_add_and_contains(urls):
+    bloom = BloomFilter(capacity=len(urls), error_rate=0.01)
+    assert not bloom.add(urls[0])
+    assert bloom.add(urls[0])
+    assert urls[0] in bloom
+    assert len(bloom) == 1
+
+
+def test_false_positive_rate(urls):
+    bloom = BloomFilter(capacity=len(urls), error_rate=0.01).update(urls)
+    assert all(url in bloom for url in urls)
+
+    unseen = [f"https://www.example.org/other-{i}" for i in range(5000)]
+    false_positives = sum(url in bloom for url in unseen)
+    assert false_positives < 5000 * 0.03
+
+
+def test_invalid_arguments():
+    with raises(ValueError):
+        BloomFilter(capacity=0)
+    with raises(ValueError):
+        BloomFilter(capacity=10, error_rate=1.5)
+
+
+def test_from_files_follows_index(sitemap_tree, urls):
+    bloom = BloomFilter.from_files([sitemap_tree], capacity=len(urls))
+    assert len(bloom) == len(urls)
+    assert all(url in bloom for url in urls)
+
+
+def test_from_files_missing_sitemap(sitemap_tree):
+    (sitemap_tree.parent / "sitemap-1.xml").unlink()
+    with raises(FileNotFoundError):
+        BloomFilter.from_files([sitemap_tree], capacity=10)
+
+
+def test_filter_new_with_normalizer(urls):
+    sitemap = Sitemap.from_list(urls[:10])
+    bloom = BloomFilter.from_sitemaps(
+        [sitemap], normalizer=URLNormalizer(trailing_slash="strip")
+    )
+
+    incoming = ["https://WWW.example.com/page-1", "https://www.example.com/new/"]
+    assert list(bloom.filter_new(incoming)) == ["https://www.example.com/new/"]
+    assert list(bloom.filter_new(incoming)) == []
+
+
+def test_save_and_load(tmp_path, urls):
+    path = tmp_path / "urls.bloom"
+    BloomFilter(capacity=len(urls)).update(urls).save(path)
+
+    with BloomFilter.load(path) as bloom:
+        assert len(bloom) == len(urls)
+        assert all(url in bloom for url in urls)
+        # Adds on a mapped filter stay in memory
+        assert not bloom.add("https://www.example.com/new/")
+
+    reloaded = BloomFilter.load(path, use_mmap=False)
+    assert "https://www.example.com/new/" not in reloaded
+    assert len(reloaded) == len(urls)
+
+
+def test_save_over_loaded_file(tmp_path, urls):
+    path = tmp_path / "urls.bloom"
+    BloomFilter(capacity=len(urls)).update(urls[:-1]).save(path)
+
+    with BloomFilter.load(path) as bloom:
+        bloom.add(urls[-1])
+        bloom.save(path)
+        # The mapped file was replaced, not truncated under the map
+        assert all(url in bloom for url in urls)
+
+    reloaded = BloomFilter.load(path, use_mmap=False)
+    assert len(reloaded) == len(urls)
+    assert all(url in reloaded for url in urls)
+    assert [p.name for p in tmp_path.iterdir()] == ["urls.bloom"]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-filter"
+    path.write_bytes(b"<urlset/>" * 10)
+    with raises(ValueError):
+        BloomFilter.load(path)
@@ -0,0 +1,92 @@
+import threading
+
+from pytest import raises
+
+from sitemapy import (
+    ConcurrentSitemapBuilder,
+    ShardedSitemapWriter,
+    Sitemap,
+    SitemapIndex,
+    URLNormalizer,
+)
+from sitemapy.builder import _ShardedDigestSet
+
+
+def _produce(builder, partition, count=500):
+    for i in range(count):
+        builder.add_url(f"https://www.example.com/{partition}/{i}/")
+
+
+def _run_producers(builder, partitions):
+    threads = [
+        threading.Thread(target=_produce, args=(builder, partition))
+        for partition in partitions
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_builder_collects_from_threads():
+    with ConcurrentSitemapBuilder(batch_size=64) as builder:
+        _run_producers(builder, range(8))
+
+    sitemap = builder.sink
+    assert isinstance(sitemap, Sitemap)
+    assert builder.url_count == len(sitemap) == 4000
+    assert len({u.loc for u in sitemap}) == 4000
+
+    # Order within each producer is kept
+    locs = [u.loc for u in sitemap if u.loc.startswith("https://www.example.com/3/")]
+    assert locs == [f"https://www.example.com/3/{i}/" for i in range(500)]
+
+
+def test_builder_dedup_across_threads():
+    with ConcurrentSitemapBuilder(batch_size=50, dedup=True, dedup_shards=4) as builder:
+        # Every partition twice, from different threads
+        _run_producers(builder, [0, 1, 2, 0, 1, 2])
+
+    assert builder.url_count == len(builder.sink) == 1500
+    assert builder.duplicate_count == 1500
+
+
+def test_builder_normalized_dedup():
+    builder = ConcurrentSitemapBuilder(normalizer=URLNormalizer())
+    builder.add_url("https://WWW.example.com/a/?utm_source=x")
+    builder.add_url("https://www.example.com/a/", lastmod="2025-01-01")
+    builder.close()
+
+    assert [u.loc for u in builder.sink] == ["https://WWW.example.com/a/?utm_source=x"]
+
+
+def test_sharded_digest_set():
+    seen = _ShardedDigestSet(4)
+    # Low bits shared by every digest, high bits spread them over the shards
+    digests = [(i << 32) | 7 for i in range(200)]
+
+    assert seen.filter_new(digests[:150] + digests[:10]) == [True] * 150 + [False] * 10
+    assert seen.filter_new(digests[100:]) == [False] * 50 + [True] * 50
+    assert len(seen) == 200
+
+
+def test_builder_feeds_sharded_writer(tmp_path):
+    with ShardedSitemapWriter(
+        tmp_path, "https://www.example.com/", max_urls=1000
+    ) as writer:
+        with ConcurrentSitemapBuilder(writer, batch_size=100, dedup=True) as builder:
+            _run_producers(builder, range(4))
+
+    assert writer.url_count == 2000
+    assert len(SitemapIndex.from_file(str(tmp_path / "sitemap-index.xml"))) == 2
+
+
+def test_builder_closed():
+    builder = ConcurrentSitemapBuilder()
+    builder.add_url("https://www.example.com/")
+    builder.close()
+
+    with raises(ValueError):
+        builder.add_url("https://www.example.com/other/")
+    with raises(ValueError):
+        ConcurrentSitemapBuilder(batch_size=0)
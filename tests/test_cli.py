@@ -0,0 +1,215 @@
+import gzip
+import json
+
+from pytest import fixture
+
+from sitemapy import Sitemap, SitemapIndex
+from sitemapy.cli import main
+
+
+@fixture
+def csv_input(tmp_path):
+    path = tmp_path / "urls.csv"
+    rows = ["loc,lastmod,changefreq,priority"]
+    rows += [
+        f"https://www.example.com/page-{i}/,2025-12-0{i % 9 + 1},daily,0.5"
+        for i in range(25)
+    ]
+    rows.append("https://www.example.com/page-0/,,,")
+    path.write_text("\n".join(rows) + "\n")
+    return path
+
+
+@fixture
+def jsonl_input(tmp_path):
+    path = tmp_path / "urls.jsonl"
+    records = [
+        {
+            "loc": "https://www.example.com/en/",
+            "alternates": [{"hreflang": "de", "href": "https://www.example.com/de/"}],
+            "images": ["https://www.example.com/cat.png"],
+        },
+        {"loc": "https://www.example.com/de/", "priority": 0.8},
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    return path
+
+
+def test_build_single_file(tmp_path, csv_input):
+    output = tmp_path / "sitemap.xml.gz"
+    assert main(["build", str(csv_input), "-o", str(output), "--dedup"]) == 0
+
+    sitemap = Sitemap.from_file(output)
+    assert len(sitemap) == 25
+    assert sitemap.urls[0].priority == 0.5
+
+
+def test_build_jsonl_extensions(tmp_path, jsonl_input):
+    output = tmp_path / "sitemap.xml"
+    assert main(["build", str(jsonl_input), "-o", str(output)]) == 0
+
+    first, second = Sitemap.from_file(output)
+    assert first.hreflang_alts[0].href == "https://www.example.com/de/"
+    assert first.images[0].loc == "https://www.example.com/cat.png"
+    assert second.priority == 0.8
+
+
+def test_failed_build_keeps_previous_output(tmp_path, csv_input):
+    output = tmp_path / "sitemap.xml"
+    assert main(["build", str(csv_input), "-o", str(output)]) == 0
+    previous = output.read_bytes()
+
+    bad = tmp_path / "bad.jsonl"
+    records = [
+        {"loc": "https://www.example.com/a/"},
+        {"loc": "https://b/", "priority": "high"},
+    ]
+    bad.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+
+    assert main(["build", str(bad), "-o", str(output)]) == 2
+    assert output.read_bytes() == previous
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "bad.jsonl",
+        "sitemap.xml",
+        "urls.csv",
+    ]
+
+
+def test_build_reports_bad_records(tmp_path, capsys):
+    bad = tmp_path / "bad.jsonl"
+    for line, message in [
+        ("[1, 2]", "bad.jsonl:2: expected a JSON object, received: list"),
+        (
+            '{"loc": "https://a.com/", "news": {"headline": "x"}}',
+            "bad.jsonl:2: invalid record: unknown news fields: headline",
+        ),
+        (
+            '{"loc": "https://a.com/", "priority": "high"}',
+            "bad.jsonl:2: invalid record",
+        ),
+        (
+            '{"priority": 0.5}',
+            "bad.jsonl:2: invalid record: missing required field: loc",
+        ),
+    ]:
+        bad.write_text('{"loc": "https://a.com/ok/"}\n' + line + "\n")
+        assert main(["build", str(bad), "-o", str(tmp_path / "out.xml")]) == 2
+        assert message in capsys.readouterr().err
+
+
+def test_build_sharded(tmp_path, csv_input):
+    output = tmp_path / "out"
+    args = ["build", str(csv_input), "-o", str(output), "--max-urls", "10"]
+    args += ["--base-url", "https://www.example.com/sitemaps", "--compress-level", "1"]
+    assert main(args) == 0
+
+    index = SitemapIndex.from_file(output / "sitemap-index.xml")
+    assert [e.loc for e in index] == [
+        f"https://www.example.com/sitemaps/sitemap-{i}.xml.gz" for i in (1, 2, 3)
+    ]
+    assert len(list(Sitemap.iter_tree(output / "sitemap-index.xml"))) == 26
+
+
+def test_shard_with_workers(tmp_path, csv_input):
+    source = tmp_path / "source.xml"
+    main(["build", str(csv_input), "-o", str(source)])
+
+    output = tmp_path / "out"
+    args = ["shard", str(source), "-o", str(output), "--max-urls", "10"]
+    args += ["--base-url", "https://www.example.com/", "--workers", "2"]
+    assert main(args) == 0
+
+    locs = [u.loc for u in Sitemap.iter_tree(output / "sitemap-index.xml")]
+    assert locs == [u.loc for u in Sitemap.iter_file(source)]
+
+
+def test_shard_requires_base_url(tmp_path, csv_input, capsys):
+    assert main(["shard", str(csv_input), "-o", str(tmp_path / "out")]) == 2
+    assert "--base-url" in capsys.readouterr().err
+
+
+def test_merge_and_diff(tmp_path, capsys):
+    old = tmp_path / "old.xml"
+    new = tmp_path / "new.xml"
+    Sitemap.from_list(["https://a.com/1", "https://a.com/2"]).write_to_file(str(old))
+    Sitemap.from_list(["https://a.com/2", "https://a.com/3"]).write_to_file(str(new))
+
+    merged = tmp_path / "merged.xml"
+    assert main(["merge", str(old), str(new), "-o", str(merged), "--dedup"]) == 0
+    assert [u.loc for u in Sitemap.iter_file(merged)] == [
+        "https://a.com/1",
+        "https://a.com/2",
+        "https://a.com/3",
+    ]
+
+    capsys.readouterr()
+    assert main(["diff", str(old), str(new)]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "- https://a.com/1",
+        "+ https://a.com/3",
+    ]
+    assert main(["diff", str(old), str(old)]) == 0
+
+
+def test_diff_is_sorted_and_ignores_repeats(tmp_path, capsys):
+    old = tmp_path / "old.xml"
+    new = tmp_path / "new.xml"
+    Sitemap.from_list(
+        ["https://a.com/5", "https://a.com/1", "https://a.com/3", "https://a.com/1"]
+    ).write_to_file(str(old))
+    Sitemap.from_list(
+        ["https://a.com/4", "https://a.com/3", "https://a.com/6", "https://a.com/4"]
+    ).write_to_file(str(new))
+
+    assert main(["diff", str(old), str(new)]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "- https://a.com/1",
+        "+ https://a.com/4",
+        "- https://a.com/5",
+        "+ https://a.com/6",
+    ]
+
+
+def test_validate(tmp_path, capsys):
+    good = tmp_path / "good.xml"
+    Sitemap().add_url("https://a.com/", lastmod="2025-12-01").write_to_file(str(good))
+    assert main(["validate", str(good)]) == 0
+
+    assert main(["validate", "tests/test-sitemap.xml"]) == 1
+    assert "not an absolute" in capsys.readouterr().out
+
+    bad = tmp_path / "bad.xml"
+    bad.write_text("<urlset><url>")
+    assert main(["validate", str(bad)]) == 1
+
+
+def test_convert_round_trip(tmp_path):
+    compressed = tmp_path / "sitemap.xml.gz"
+    plain = tmp_path / "sitemap.xml"
+    assert main(["convert", "tests/test-sitemap.xml", str(compressed)]) == 0
+    assert main(["convert", str(compressed), str(plain)]) == 0
+
+    with gzip.open(compressed, "rb") as f:
+        assert f.read() == plain.read_bytes()
+    assert plain.read_bytes() == open("tests/test-sitemap.xml", "rb").read()
+
+
+def test_build_sorted(tmp_path, csv_input):
+    output = tmp_path / "sitemap.xml"
+    assert (
+        main(
+            [
+                "build",
+                str(csv_input),
+                "-o",
+                str(output),
+                "--sort",
+                "lastmod",
+                "--reverse",
+            ]
+        )
+        == 0
+    )
+
+    lastmods = [u.lastmod or "" for u in Sitemap.iter_file(output)]
+    assert lastmods == sorted(lastmods, reverse=True)
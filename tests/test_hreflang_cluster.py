@@ -0,0 +1,69 @@
+import xml.etree.ElementTree as ET
+
+from pytest import fixture, raises
+
+from sitemapy import Sitemap, URLEntry, HreflangAlternate, HreflangCluster, XHTML_NS
+
+
+@fixture
+def locales():
+    return {
+        "en": "https://www.example.com/en/",
+        "de": "https://www.example.com/de/",
+        "es": "https://www.example.com/es/",
+    }
+
+
+def test_cluster_from_dict(locales):
+    cluster = HreflangCluster.from_dict(locales)
+    assert len(cluster) == 3
+    assert [a.hreflang for a in cluster] == ["en", "de", "es"]
+
+
+def test_cluster_from_mixed_list():
+    cluster = HreflangCluster(
+        [
+            HreflangAlternate(hreflang="en", href="https://www.example.com/en/"),
+            {"hreflang": "de", "href": "https://www.example.com/de/"},
+        ]
+    )
+    assert len(cluster.alternates) == 2
+
+    with raises(ValueError):
+        HreflangCluster([{"hreflang": "fr"}])
+
+
+def test_cluster_members_share_alternates(locales):
+    cluster = HreflangCluster.from_dict(locales)
+    entries = cluster.to_url_entries(lastmod="2025-12-01")
+
+    assert [e.loc for e in entries] == list(locales.values())
+    assert all(e.hreflang_cluster is cluster for e in entries)
+    assert all(e.lastmod == "2025-12-01" for e in entries)
+
+
+def test_set_hreflang_cluster_type_check():
+    with raises(TypeError):
+        URLEntry(loc="https://www.example.com/").set_hreflang_cluster({"en": "x"})
+
+
+def test_write_cluster(tmp_path, locales):
+    """Test that every cluster member is written with the full alternate set"""
+    cluster = HreflangCluster.from_dict(locales)
+    sitemap = Sitemap().add_hreflang_cluster(cluster)
+    sitemap.urls[0].add_image("https://www.example.com/cat.png")
+    output_file = tmp_path / "cluster.xml"
+
+    sitemap.write_to_file(str(output_file))
+
+    root = ET.parse(output_file).getroot()
+    url_elements = list(root)
+    assert len(url_elements) == 3
+    for url_elem in url_elements:
+        links = url_elem.findall(f"{XHTML_NS}link")
+        assert [(l.get("hreflang"), l.get("href")) for l in links] == list(
+            locales.items()
+        )
+
+    reloaded = Sitemap.from_file(output_file)
+    assert all(len(u.hreflang_alts) == 3 for u in reloaded)
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, timezone
+import gzip
+
+from pytest import fixture, raises
+
+from sitemapy import NewsEntry, NewsSitemap, Sitemap, URLEntry
+from sitemapy.news import parse_publication_date
+
+NOW = datetime(2025, 6, 10, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+class Clock:
+    def __init__(self, now: float = NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@fixture
+def clock():
+    return Clock()
+
+
+@fixture
+def news(clock):
+    return NewsSitemap("Example Times", "en", clock=clock)
+
+
+def test_parse_publication_date():
+    assert parse_publication_date("2025-06-10T12:00:00Z") == NOW
+    assert parse_publication_date("2025-06-10T14:00:00+02:00") == NOW
+    assert parse_publication_date(datetime(2025, 6, 10, 12)) == NOW
+    assert parse_publication_date("2025-06-10") == NOW - 12 * 3600
+    assert parse_publication_date("2025-06-10T13:00:00.5+01:00") == NOW + 0.5
+    assert parse_publication_date("2025-06-10T12:00:00.25Z") == NOW + 0.25
+    assert parse_publication_date("2025-06-10T12:00:00.123456789Z") == NOW + 0.123456
+
+    with raises(ValueError):
+        parse_publication_date("yesterday")
+
+
+def test_publish(news):
+    news.publish("https://www.example.com/a/", "2025-06-10T08:00:00Z", title="A")
+    news.publish("https://www.example.com/b/", title="B")
+
+    assert len(news) == 2
+    assert [u.loc for u in news] == [
+        "https://www.example.com/b/",
+        "https://www.example.com/a/",
+    ]
+    latest = next(iter(news)).news_entry
+    assert latest.publication_date == "2025-06-10T12:00:00+00:00"
+    assert latest.publication_name == "Example Times"
+    assert latest.publication_language == "en"
+
+
+def test_republish_replaces(news):
+    news.publish("https://www.example.com/a/", "2025-06-09T08:00:00Z", title="Old")
+    news.publish("https://www.example.com/a/", "2025-06-10T08:00:00Z", title="New")
+
+    assert len(news) == 1
+    assert next(iter(news)).news_entry.title == "New"
+
+
+def test_evicts_expired(news, clock):
+    news.publish("https://www.example.com/old/", "2025-06-08T11:00:00Z")
+    assert "https://www.example.com/old/" not in news
+
+    news.publish("https://www.example.com/a/", "2025-06-09T12:00:00Z")
+    news.publish("https://www.example.com/b/", "2025-06-10T00:00:00Z")
+
+    clock.now += timedelta(hours=30).total_seconds()
+    evicted = news.evict()
+
+    assert [u.loc for u in evicted] == ["https://www.example.com/a/"]
+    assert [u.loc for u in news] == ["https://www.example.com/b/"]
+
+
+def test_expires_without_publishing(tmp_path, news, clock):
+    news.publish("https://www.example.com/a/", "2025-06-09T12:00:00Z")
+    news.publish("https://www.example.com/b/", "2025-06-10T00:00:00Z")
+    assert b"/a/" in news.to_bytes()
+
+    # A quiet weekend: nothing published, yet the output must not go stale
+    clock.now += timedelta(hours=30).total_seconds()
+    assert b"/a/" not in news.to_bytes()
+    assert [u.loc for u in news.to_sitemap()] == ["https://www.example.com/b/"]
+
+    clock.now += timedelta(days=2).total_seconds()
+    news.write_to_file(tmp_path / "sitemap-news.xml")
+    assert len(Sitemap.from_file(str(tmp_path / "sitemap-news.xml"))) == 0
+    assert list(news) == []
+
+
+def test_evicts_oldest_beyond_max_urls(clock):
+    news = NewsSitemap("Example Times", "en", max_urls=3, clock=clock)
+    for hour in range(5):
+        news.publish(f"https://www.example.com/{hour}/", f"2025-06-10T0{hour}:00:00Z")
+
+    assert [u.loc for u in news] == [
+        "https://www.example.com/4/",
+        "https://www.example.com/3/",
+        "https://www.example.com/2/",
+    ]
+
+
+def test_remove(news):
+    news.publish("https://www.example.com/a/")
+    news.remove("https://www.example.com/a/").remove("https://www.example.com/x/")
+
+    assert len(news) == 0
+    assert news.evict() == []
+
+
+def test_document_is_regenerated_on_change(news):
+    news.publish("https://www.example.com/a/", "2025-06-10T08:00:00Z", title="A & B")
+    first = news.to_bytes()
+    assert news.to_bytes() is first
+
+    news.publish("https://www.example.com/b/", "2025-06-10T09:00:00Z", title="B")
+    second = news.to_bytes()
+
+    assert second is not first
+    assert second == news.to_sitemap().to_bytes()
+    assert gzip.decompress(news.to_bytes(compress=True)) == second
+
+
+def test_write_and_resume(tmp_path, news, clock):
+    entry = URLEntry("https://www.example.com/a/")
+    entry.add_news_entry(NewsEntry(publication_date="2025-06-10T08:00:00Z", title="A"))
+    news.extend([entry])
+    news.publish("https://www.example.com/b/", "2025-06-09T08:00:00Z", title="B")
+
+    output_file = tmp_path / "sitemap-news.xml.gz"
+    news.write_to_file(output_file)
+    assert [u.loc for u in Sitemap.from_file(output_file)] == [
+        "https://www.example.com/a/",
+        "https://www.example.com/b/",
+    ]
+
+    clock.now += timedelta(days=1).total_seconds()
+    resumed = NewsSitemap.from_file(output_file, "Example Times", "en", clock=clock)
+    assert [u.loc for u in resumed] == ["https://www.example.com/a/"]
+    assert next(iter(resumed)).news_entry.title == "A"
+
+
+def test_heap_is_compacted(news):
+    for i in range(200):
+        news.publish("https://www.example.com/a/", f"2025-06-10T08:{i % 60:02d}:00Z")
+
+    assert len(news) == 1
+    assert len(news._heap) <= 2 * len(news) + 64
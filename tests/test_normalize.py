@@ -0,0 +1,117 @@
+from pytest import fixture, raises
+
+from sitemapy import Sitemap, URLNormalizer
+from sitemapy.normalize import _DigestSet
+
+
+@fixture
+def normalizer():
+    return URLNormalizer(trailing_slash="strip")
+
+
+def test_host_case_and_default_port(normalizer):
+    assert normalizer.normalize("HTTPS://Example.COM:443/a") == "https://example.com/a"
+    assert normalizer.normalize("http://example.com:80/a") == "http://example.com/a"
+    assert (
+        normalizer.normalize("http://example.com:8080/a") == "http://example.com:8080/a"
+    )
+
+
+def test_path_case_is_preserved(normalizer):
+    assert normalizer.normalize("https://example.com/About") == (
+        "https://example.com/About"
+    )
+
+
+def test_trailing_slash_policies():
+    url = "https://example.com/a/"
+    assert URLNormalizer().normalize(url) == url
+    assert URLNormalizer(trailing_slash="strip").normalize(url) == (
+        "https://example.com/a"
+    )
+    add = URLNormalizer(trailing_slash="add")
+    assert add.normalize("https://example.com/a") == url
+    assert add.normalize("https://example.com/feed.xml") == (
+        "https://example.com/feed.xml"
+    )
+    assert add.normalize("https://example.com") == "https://example.com/"
+
+    with raises(ValueError):
+        URLNormalizer(trailing_slash="sometimes")
+
+
+def test_percent_encoding(normalizer):
+    assert normalizer.normalize("https://example.com/%7euser/%c3%a9") == (
+        "https://example.com/~user/%C3%A9"
+    )
+
+
+def test_query_sorting_and_stripping(normalizer):
+    assert normalizer.normalize(
+        "https://example.com/a?b=2&utm_source=x&a=1&gclid=abc#top"
+    ) == ("https://example.com/a?a=1&b=2")
+    assert normalizer.normalize("https://example.com/a?utm_medium=x") == (
+        "https://example.com/a"
+    )
+
+    keep_all = URLNormalizer(strip_params=(), sort_query=False)
+    assert keep_all.normalize("https://example.com/?b=2&utm_source=x") == (
+        "https://example.com/?b=2&utm_source=x"
+    )
+
+
+def test_normalize_many_memoizes(normalizer):
+    urls = [f"https://Example.com/page-{i % 3}/" for i in range(30)]
+    result = normalizer.normalize_many(urls)
+
+    assert result[:3] == [f"https://example.com/page-{i}" for i in range(3)]
+    assert normalizer._netloc.cache_info().hits == 29
+    assert normalizer._path.cache_info().currsize == 3
+
+
+def test_deduplicate_normalized(normalizer):
+    sitemap = Sitemap.from_list(
+        [
+            "https://Example.com/a/",
+            "https://example.com/a",
+            "https://example.com:443/a?utm_source=mail",
+            "https://example.com/b?y=2&x=1",
+            "https://example.com/b?x=1&y=2",
+        ]
+    )
+
+    sitemap.deduplicate()
+    assert len(sitemap) == 5
+
+    sitemap.deduplicate(normalizer=normalizer)
+    assert [u.loc for u in sitemap] == [
+        "https://Example.com/a/",
+        "https://example.com/b?y=2&x=1",
+    ]
+
+
+def test_deduplicate_digests(normalizer):
+    sitemap = Sitemap.from_list(["https://example.com/a", "https://example.com/a/"])
+    sitemap.deduplicate(use_digests=True)
+    assert len(sitemap) == 2
+
+    sitemap.deduplicate(normalizer=normalizer, use_digests=True)
+    assert len(sitemap) == 1
+
+
+def test_normalize_urls(normalizer):
+    sitemap = Sitemap.from_list(["https://Example.com/a/?b=1&a=2"])
+    sitemap.normalize_urls(normalizer)
+    assert sitemap.urls[0].loc == "https://example.com/a?a=2&b=1"
+
+
+def test_digest_set_grows_and_probes():
+    seen = _DigestSet()
+    # Same low bits, so every digest probes past the previous ones
+    digests = [i << 40 for i in range(100)]
+
+    assert all(seen.add(d) for d in digests)
+    assert not any(seen.add(d) for d in digests)
+    assert len(seen) == 100
+    assert all(d in seen for d in digests)
+    assert (100 << 40) not in seen
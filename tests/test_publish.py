@@ -0,0 +1,182 @@
+import os
+
+from pytest import fixture, raises
+
+from sitemapy import AtomicShardedSitemapWriter, Sitemap, SitemapIndex
+from sitemapy.cli import main
+import sitemapy.publish as publish
+
+
+@fixture
+def urls():
+    return [f"https://www.example.com/page-{i}/" for i in range(25)]
+
+
+def _publish(target, urls, **kwargs):
+    with AtomicShardedSitemapWriter(
+        target, "https://www.example.com/sitemaps/", max_urls=10, **kwargs
+    ) as writer:
+        writer.write_many(urls)
+    return writer
+
+
+def _versions(target):
+    return sorted(
+        p.name
+        for p in target.parent.iterdir()
+        if p.name.startswith(f".{target.name}.sitemapy-")
+    )
+
+
+def test_symlink_publish(tmp_path, urls):
+    target = tmp_path / "sitemaps"
+    writer = _publish(target, urls)
+
+    assert target.is_symlink()
+    assert writer.directory == target
+    assert sorted(p.name for p in target.iterdir()) == [
+        "sitemap-1.xml.gz",
+        "sitemap-2.xml.gz",
+        "sitemap-3.xml.gz",
+        "sitemap-index.xml",
+    ]
+    assert len(SitemapIndex.from_file(str(target / "sitemap-index.xml"))) == 3
+
+    first = os.readlink(target)
+    _publish(target, urls[:5])
+    assert os.readlink(target) != first
+    assert len(list(Sitemap.iter_tree(target / "sitemap-index.xml"))) == 5
+    # Previous set kept for rollback
+    assert first in _versions(target)
+
+    _publish(target, urls[:15])
+    assert first not in _versions(target)
+    assert len(_versions(target)) == 2
+
+
+def test_symlink_publish_over_plain_directory(tmp_path, urls):
+    target = tmp_path / "sitemaps"
+    target.mkdir()
+    (target / "sitemap-9.xml.gz").write_bytes(b"old")
+
+    _publish(target, urls, keep=0)
+
+    assert target.is_symlink()
+    assert not (target / "sitemap-9.xml.gz").exists()
+    assert _versions(target) == [os.readlink(target)]
+
+
+def test_replace_publish(tmp_path, urls):
+    target = tmp_path / "sitemaps"
+    _publish(target, urls, swap="replace")
+    _publish(target, urls[:12], swap="replace")
+
+    assert not target.is_symlink()
+    assert sorted(p.name for p in target.iterdir()) == [
+        "sitemap-1.xml.gz",
+        "sitemap-2.xml.gz",
+        "sitemap-index.xml",
+    ]
+    assert _versions(target) == []
+
+
+def test_failed_publish_keeps_current_set(tmp_path, urls):
+    target = tmp_path / "sitemaps"
+    _publish(target, urls)
+    current = os.readlink(target)
+
+    with raises(RuntimeError):
+        with AtomicShardedSitemapWriter(
+            target, "https://www.example.com/sitemaps/", max_urls=10
+        ) as writer:
+            writer.write_many(urls[:15])
+            raise RuntimeError("job died")
+
+    assert os.readlink(target) == current
+    assert _versions(target) == [current]
+    assert len(list(Sitemap.iter_tree(target / "sitemap-index.xml"))) == 25
+
+
+def test_files_synced_once_after_writing(monkeypatch, tmp_path, urls):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(publish.os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+
+    _publish(tmp_path / "sitemaps", urls)
+
+    # Four files, the staging directory and the parent after the flip
+    assert len(synced) == 6
+
+
+def test_invalid_options(tmp_path):
+    with raises(ValueError):
+        AtomicShardedSitemapWriter(tmp_path / "a", "https://e.com/", swap="copy")
+    with raises(ValueError):
+        AtomicShardedSitemapWriter(tmp_path / "a", "https://e.com/", max_urls=0)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_shards_atomic(tmp_path, urls):
+    target = tmp_path / "sitemaps"
+    index = Sitemap.from_list(urls).write_shards(
+        target, "https://www.example.com/sitemaps/", atomic=True, max_urls=10
+    )
+
+    assert len(index) == 3
+    assert target.is_symlink()
+
+
+def test_cli_atomic(tmp_path, urls):
+    source = tmp_path / "sitemap.xml"
+    Sitemap.from_list(urls).write_to_file(str(source))
+    target = tmp_path / "sitemaps"
+
+    assert (
+        main(
+            [
+                "shard",
+                str(source),
+                "-o",
+                str(target),
+                "--base-url",
+                "https://www.example.com/sitemaps/",
+                "--max-urls",
+                "10",
+                "--atomic",
+            ]
+        )
+        == 0
+    )
+    assert target.is_symlink()
+    assert (target / "sitemap-index.xml").exists()
+
+
+def test_published_set_is_readable(tmp_path, urls):
+    umask = os.umask(0o022)
+    try:
+        target = tmp_path / "sitemaps"
+        _publish(target, urls)
+    finally:
+        os.umask(umask)
+
+    assert target.resolve().stat().st_mode & 0o777 == 0o755
+    assert (target / "sitemap-index.xml").stat().st_mode & 0o777 == 0o644
+
+
+def test_crashed_staging_does_not_displace_rollback_set(tmp_path, urls):
+    target = tmp_path / "sitemaps"
+    _publish(target, urls)
+    _publish(target, urls[:5])
+    rollback = os.readlink(target)
+
+    # A run that dies before close leaves its staging directory behind
+    crashed = AtomicShardedSitemapWriter(
+        target, "https://www.example.com/sitemaps/", max_urls=10
+    )
+    crashed.write_many(urls)
+    assert crashed.staging.exists()
+
+    _publish(target, urls[:15])
+
+    assert not crashed.staging.exists()
+    assert _versions(target) == sorted([rollback, os.readlink(target)])
@@ -0,0 +1,239 @@
+import gzip
+import pickle
+import xml.etree.ElementTree as ET
+
+from pytest import fixture, importorskip, mark, param, raises
+
+from sitemapy import (
+    HreflangCluster,
+    NewsEntry,
+    ShardedSitemapWriter,
+    Sitemap,
+    SitemapIndex,
+    SitemapSerializer,
+    SitemapWriter,
+    URLEntry,
+    get_serializer,
+)
+
+
+def _lxml_installed():
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+BACKENDS = [
+    "etree",
+    "template",
+    param(
+        "lxml",
+        marks=mark.skipif(not _lxml_installed(), reason="lxml is not installed"),
+    ),
+]
+
+
+def _canonical(document: bytes) -> str:
+    return ET.canonicalize(document.decode("utf-8"), strip_text=True)
+
+
+@fixture
+def sitemap():
+    sitemap = Sitemap()
+    sitemap.add_url(
+        "https://www.example.com/?a=1&b=<2>",
+        lastmod="2024-01-01",
+        changefreq="daily",
+        priority=0.8,
+    )
+    sitemap.add_url("https://www.example.com/empty/", lastmod="")
+
+    entry = URLEntry("https://www.example.com/images/")
+    entry.add_image('https://www.example.com/a.png?size=1&crop="2"')
+    entry.add_image("https://www.example.com/b.png")
+    entry.add_alternate(hreflang="en-US", href='https://www.example.com/"en"/')
+    sitemap.urls.append(entry)
+
+    news = URLEntry("https://www.example.com/news/")
+    news.add_news_entry(
+        NewsEntry(
+            publication_name="Example & Co",
+            publication_language="en",
+            publication_date="2024-01-01",
+            title="Title <with> markup",
+        )
+    )
+    sitemap.urls.append(news)
+
+    empty_news = URLEntry("https://www.example.com/news-empty/")
+    empty_news.add_news_entry(NewsEntry())
+    sitemap.urls.append(empty_news)
+
+    date_only = URLEntry("https://www.example.com/news-date/")
+    date_only.add_news_entry(NewsEntry(publication_date="2024-01-02"))
+    sitemap.urls.append(date_only)
+
+    sitemap.add_hreflang_cluster(
+        HreflangCluster.from_dict(
+            {
+                "en": "https://www.example.com/en/",
+                "de": "https://www.example.com/de/?q=a&b",
+            }
+        ),
+        lastmod="2024-02-01",
+    )
+    sitemap.add_url("https://www.example.com/ünïcode/")
+
+    return sitemap
+
+
+@fixture
+def carriage_return():
+    sitemap = Sitemap()
+    news = URLEntry("https://www.example.com/cr/")
+    news.add_news_entry(NewsEntry(title="Line one\r\nline two"))
+    sitemap.urls.append(news)
+
+    return sitemap
+
+
+@fixture
+def index():
+    index = SitemapIndex()
+    index.add_sitemap("https://www.example.com/sitemap-1.xml.gz", lastmod="2024-01-01")
+    index.add_sitemap("https://www.example.com/sitemap-2.xml.gz?a=1&b=2")
+
+    return index
+
+
+def _with_serializer(obj, serializer):
+    obj.serializer = serializer
+    return obj
+
+
+@mark.parametrize("backend", BACKENDS)
+def test_urlset_matches_reference(sitemap, backend):
+    expected = _with_serializer(sitemap, "etree").to_bytes()
+    actual = _with_serializer(sitemap, backend).to_bytes()
+
+    assert _canonical(actual) == _canonical(expected)
+
+
+@mark.parametrize("backend", BACKENDS)
+def test_urlset_round_trips(tmp_path, sitemap, backend):
+    output_file = tmp_path / "sitemap.xml"
+    _with_serializer(sitemap, backend).write_to_file(str(output_file))
+
+    parsed = Sitemap.from_file(str(output_file))
+    assert [u.loc for u in parsed] == [u.loc for u in sitemap]
+    assert parsed.urls[0].loc == "https://www.example.com/?a=1&b=<2>"
+    assert parsed.urls[3].news_entry.title == "Title <with> markup"
+    assert len(parsed.urls[6].hreflang_alts) == 2
+
+
+@mark.parametrize("backend", BACKENDS)
+def test_index_matches_reference(index, backend):
+    expected = _with_serializer(index, "etree").to_bytes()
+    actual = _with_serializer(index, backend).to_bytes()
+
+    assert _canonical(actual) == _canonical(expected)
+
+
+@mark.parametrize("backend", BACKENDS)
+def test_streaming_writers_match_reference(tmp_path, sitemap, backend):
+    output_file = tmp_path / "sitemap.xml.gz"
+    with SitemapWriter(output_file, serializer=backend) as writer:
+        writer.write_many(sitemap)
+
+    expected = _with_serializer(sitemap, "etree").to_bytes()
+    assert _canonical(gzip.decompress(output_file.read_bytes())) == _canonical(expected)
+
+
+@mark.parametrize("backend", BACKENDS)
+def test_sharded_writer_backend(tmp_path, sitemap, backend):
+    with ShardedSitemapWriter(
+        tmp_path, "https://www.example.com/", max_urls=3, serializer=backend
+    ) as writer:
+        writer.write_many(sitemap)
+
+    urls = []
+    for path in sorted(tmp_path.glob("sitemap-*.xml.gz")):
+        urls.extend(u.loc for u in Sitemap.iter_file(path))
+    assert urls == [u.loc for u in sitemap]
+    assert len(SitemapIndex.from_file(str(tmp_path / "sitemap-index.xml"))) == 3
+
+
+@mark.parametrize("backend", BACKENDS)
+def test_serializer_is_picklable(sitemap, backend):
+    serializer = get_serializer(backend)
+    serializer.url(sitemap.urls[0])
+
+    restored = pickle.loads(pickle.dumps(serializer))
+    assert restored.url(sitemap.urls[0]) == serializer.url(sitemap.urls[0])
+
+
+def test_template_is_byte_identical(sitemap, index, carriage_return):
+    assert (
+        _with_serializer(carriage_return, "template").to_bytes()
+        == _with_serializer(carriage_return, "etree").to_bytes()
+    )
+    assert (
+        _with_serializer(sitemap, "template").to_bytes()
+        == _with_serializer(sitemap, "etree").to_bytes()
+    )
+    assert (
+        _with_serializer(index, "template").to_bytes()
+        == _with_serializer(index, "etree").to_bytes()
+    )
+
+
+def test_lxml_is_byte_identical(sitemap, index):
+    importorskip("lxml")
+
+    assert (
+        _with_serializer(sitemap, "lxml").to_bytes()
+        == _with_serializer(sitemap, "etree").to_bytes()
+    )
+    assert (
+        _with_serializer(index, "lxml").to_bytes()
+        == _with_serializer(index, "etree").to_bytes()
+    )
+
+
+def test_lxml_escapes_carriage_return(carriage_return):
+    importorskip("lxml")
+    etree = _with_serializer(carriage_return, "etree").to_bytes()
+    lxml = _with_serializer(carriage_return, "lxml").to_bytes()
+
+    # The one documented difference: lxml keeps CR through parsing as &#13;,
+    # the other backends write it raw and parsers read it back as a newline
+    assert b"\r" in etree
+    assert lxml == etree.replace(b"\r", b"&#13;")
+    title = ".//{http://www.google.com/schemas/sitemap-news/0.9}title"
+    assert ET.fromstring(lxml).find(title).text == "Line one\r\nline two"
+    assert ET.fromstring(etree).find(title).text == "Line one\nline two"
+
+
+def test_lxml_recovers_after_invalid_entry():
+    importorskip("lxml")
+    serializer = get_serializer("lxml")
+    valid = URLEntry(loc="https://www.example.com/")
+
+    with raises(ValueError):
+        serializer.url(URLEntry(loc="https://www.example.com/\x01"))
+
+    assert serializer.url(valid) == get_serializer("etree").url(valid)
+
+
+def test_get_serializer():
+    template = get_serializer("template")
+
+    assert isinstance(template, SitemapSerializer)
+    assert get_serializer("template") is template
+    assert get_serializer(template) is template
+    assert get_serializer() is template
+
+    with raises(ValueError):
+        get_serializer("missing")
@@ -0,0 +1,217 @@
+import asyncio
+import gzip
+import threading
+from types import SimpleNamespace
+from wsgiref.util import setup_testing_defaults
+
+from pytest import fixture, raises
+
+from sitemapy import Sitemap, SitemapApp
+import sitemapy.server as server
+
+
+@fixture
+def sitemap():
+    sitemap = Sitemap.from_list([f"https://www.example.com/{i}/" for i in range(25)])
+    sitemap.urls[3].lastmod = "2025-12-01"
+    return sitemap
+
+
+@fixture
+def app(sitemap):
+    return SitemapApp(sitemap, "https://www.example.com/sitemaps", max_urls=10)
+
+
+def request(app, path, method="GET", **headers):
+    """Call the WSGI app in process and return (status, headers, body)"""
+    environ = {"PATH_INFO": path, "REQUEST_METHOD": method}
+    environ.update({f"HTTP_{k.upper()}": v for k, v in headers.items()})
+    setup_testing_defaults(environ)
+
+    response = {}
+
+    def start_response(status, response_headers):
+        response["status"] = int(status.split()[0])
+        response["headers"] = dict(response_headers)
+
+    body = b"".join(app(environ, start_response))
+    return response["status"], response["headers"], body
+
+
+def test_index(app):
+    status, headers, body = request(app, "/sitemap-index.xml")
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/xml")
+    xml = body.decode("utf-8")
+    assert xml.count("<sitemap>") == 3
+    assert "https://www.example.com/sitemaps/sitemap-1.xml.gz" in xml
+    assert "<lastmod>2025-12-01</lastmod>" in xml
+
+
+def test_shard_encodings(app):
+    status, headers, body = request(app, "/sitemap-3.xml.gz")
+    assert status == 200
+    assert headers["Content-Type"] == "application/gzip"
+    assert gzip.decompress(body).count(b"<url>") == 5
+
+    status, headers, gz_body = request(app, "/sitemap-3.xml", accept_encoding="gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert gz_body == body
+
+    status, headers, plain = request(app, "/sitemap-3.xml", accept_encoding="")
+    assert "Content-Encoding" not in headers
+    assert plain == gzip.decompress(body)
+
+
+def test_not_found_and_method(app):
+    assert request(app, "/sitemap-4.xml.gz")[0] == 404
+    assert request(app, "/robots.txt")[0] == 404
+    assert request(app, "/sitemap-1.xml.gz", method="POST")[0] == 405
+
+
+def test_conditional_get(app):
+    _, headers, _ = request(app, "/sitemap-1.xml.gz")
+
+    status, _, body = request(app, "/sitemap-1.xml.gz", if_none_match=headers["ETag"])
+    assert status == 304
+    assert body == b""
+
+    status, _, _ = request(
+        app, "/sitemap-1.xml.gz", if_modified_since=headers["Last-Modified"]
+    )
+    assert status == 304
+
+    status, _, _ = request(app, "/sitemap-1.xml.gz", if_none_match='"other"')
+    assert status == 200
+
+
+def test_head(app):
+    status, headers, body = request(app, "/sitemap-1.xml.gz", method="HEAD")
+    assert status == 200
+    assert int(headers["Content-Length"]) > 0
+    assert body == b""
+
+
+def test_cache_is_bounded_and_reused(sitemap):
+    app = SitemapApp(sitemap, "https://www.example.com/", max_urls=5, cache_size=2)
+    request(app, "/sitemap-1.xml.gz")
+    first = app._cache["1"]
+    request(app, "/sitemap-1.xml.gz")
+    assert app._cache["1"] is first
+
+    request(app, "/sitemap-2.xml.gz")
+    request(app, "/sitemap-3.xml.gz")
+    assert list(app._cache) == ["2", "3"]
+
+
+def test_refresh_from_callable():
+    catalog = ["https://www.example.com/a/"]
+    app = SitemapApp(lambda: Sitemap.from_list(catalog), "https://www.example.com/")
+    _, first_headers, _ = request(app, "/sitemap-1.xml.gz")
+
+    catalog.append("https://www.example.com/b/")
+    _, _, body = request(app, "/sitemap-1.xml.gz")
+    assert gzip.decompress(body).count(b"<url>") == 1
+
+    app.refresh()
+    _, headers, body = request(app, "/sitemap-1.xml.gz")
+    assert gzip.decompress(body).count(b"<url>") == 2
+    assert headers["ETag"] != first_headers["ETag"]
+
+
+def test_single_reload_serves_current_sitemap():
+    catalog = ["https://www.example.com/a/"]
+    loads = []
+    reloading = threading.Event()
+    release = threading.Event()
+
+    def source():
+        loads.append(len(catalog))
+        if len(loads) > 1:
+            reloading.set()
+            release.wait(5)
+        return Sitemap.from_list(catalog)
+
+    app = SitemapApp(source, "https://www.example.com/", refresh_interval=0)
+    catalog.append("https://www.example.com/b/")
+
+    slow = threading.Thread(target=request, args=(app, "/sitemap-1.xml.gz"))
+    slow.start()
+    assert reloading.wait(5)
+
+    # Other requests neither wait for nor repeat the reload in progress
+    _, _, body = request(app, "/sitemap-1.xml.gz")
+    assert gzip.decompress(body).count(b"<url>") == 1
+    assert len(loads) == 2
+
+    release.set()
+    slow.join()
+    _, _, body = request(app, "/sitemap-1.xml.gz")
+    assert gzip.decompress(body).count(b"<url>") == 2
+
+
+def test_last_modified_survives_reload_of_unchanged_content(monkeypatch):
+    now = [1_750_000_000.0]
+    monkeypatch.setattr(server, "time", SimpleNamespace(time=lambda: now[0]))
+    catalog = [f"https://www.example.com/{i}/" for i in range(15)]
+    app = SitemapApp(
+        lambda: Sitemap.from_list(catalog), "https://www.example.com/", max_urls=10
+    )
+    _, first, _ = request(app, "/sitemap-1.xml.gz")
+
+    now[0] += 3600
+    catalog.append("https://www.example.com/new/")
+    app.refresh()
+    _, headers, _ = request(app, "/sitemap-1.xml.gz")
+    assert headers["Last-Modified"] == first["Last-Modified"]
+    status, _, _ = request(
+        app, "/sitemap-1.xml.gz", if_modified_since=first["Last-Modified"]
+    )
+    assert status == 304
+
+    # Shard 2 gained a URL, so it is newer
+    _, headers, _ = request(app, "/sitemap-2.xml.gz")
+    assert headers["Last-Modified"] != first["Last-Modified"]
+
+
+def test_request_renders_from_one_sitemap(sitemap):
+    app = SitemapApp(lambda: sitemap, "https://www.example.com/sitemaps", max_urls=10)
+    render_shard = app._render_shard
+
+    def render_during_reload(source, number):
+        # The source shrinks to one shard while shard 3 is being rendered
+        app.source = lambda: Sitemap.from_list(["https://www.example.com/x/"])
+        app.refresh()
+        return render_shard(source, number)
+
+    app._render_shard = render_during_reload
+    status, _, body = request(app, "/sitemap-3.xml.gz")
+
+    assert status == 200
+    assert gzip.decompress(body).count(b"<url>") == 5
+    assert app._cache == {}
+
+
+def test_asgi(app):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/sitemap-2.xml",
+        "headers": [(b"accept-encoding", b"gzip, deflate")],
+    }
+    asyncio.run(app.asgi(scope, receive, send))
+
+    assert sent[0]["status"] == 200
+    assert (b"content-encoding", b"gzip") in sent[0]["headers"]
+    assert gzip.decompress(sent[1]["body"]).count(b"<url>") == 10
+
+    with raises(ValueError):
+        asyncio.run(app.asgi({"type": "websocket"}, receive, send))
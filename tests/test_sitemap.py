@@ -1,3 +1,5 @@
+import gzip
+import io
 from pathlib import Path
 from unittest.mock import patch
 import xml.etree.ElementTree as ET
@@ -201,3 +203,115 @@ def test_write_to_file_namespaces(tmp_path, url_text):
     assert 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"' in content
     assert "xmlns:image" in content
     assert "http://www.google.com/schemas/sitemap-image/1.1" in content
+
+
+def test_from_file_extensions():
+    """Test that hreflang alternates, all images and news are parsed"""
+    sitemap = Sitemap.from_file("tests/test-sitemap-extensions.xml")
+    assert len(sitemap) == 2
+
+    first, second = sitemap.urls
+    assert [(a.hreflang, a.href) for a in first.hreflang_alts] == [
+        ("en", "https://example.com/en/"),
+        ("de", "https://example.com/de/"),
+    ]
+    assert [i.loc for i in first.images] == [
+        "https://example.com/cat.png",
+        "https://example.com/dog.png",
+    ]
+    assert first.news_entry.publication_name == "The New York Times"
+    assert first.news_entry.publication_language == "en"
+    assert first.news_entry.publication_date == "2025-12-01"
+    assert first.news_entry.title == "First Contact Made"
+
+    # News without a publication element
+    assert second.news_entry.publication_name is None
+    assert second.news_entry.publication_date == "2025-12-02"
+    assert second.news_entry.title == "Erstkontakt"
+
+
+def test_from_file_round_trip(tmp_path):
+    """Test that writing and re-reading a sitemap preserves extension data"""
+    sitemap = Sitemap.from_file("tests/test-sitemap-extensions.xml")
+    output_file = tmp_path / "round-trip.xml"
+    sitemap.write_to_file(str(output_file))
+
+    reloaded = Sitemap.from_file(output_file)
+    assert [u.loc for u in reloaded] == [u.loc for u in sitemap]
+    assert len(reloaded.urls[0].hreflang_alts) == 2
+    assert len(reloaded.urls[0].images) == 2
+    assert reloaded.urls[1].news_entry.title == "Erstkontakt"
+
+
+def test_iter_file_compressed(tmp_path, url_text):
+    """Test streaming URLEntry objects from a gzipped sitemap"""
+    output_file = tmp_path / "sitemap.xml.gz"
+    Sitemap.from_list([url_text, "https://www.example.com/b/"]).write_compressed(
+        str(output_file)
+    )
+
+    entries = Sitemap.iter_file(output_file)
+    assert next(entries).loc == url_text
+    assert [u.loc for u in entries] == ["https://www.example.com/b/"]
+    assert len(Sitemap.from_file(output_file)) == 2
+
+
+def test_write_shards(tmp_path):
+    """Test sharding by URL count and by uncompressed size"""
+    urls = [f"https://www.example.com/page-{i}/" for i in range(25)]
+    sitemap = Sitemap.from_list(urls)
+    sitemap.urls[12].lastmod = "2025-12-01"
+
+    index = sitemap.write_shards(tmp_path, "https://www.example.com", max_urls=10)
+    assert len(index) == 3
+    assert index.index_entries[1].lastmod == "2025-12-01"
+    assert index.index_entries[0].lastmod is None
+    assert (tmp_path / "sitemap-index.xml").exists()
+    assert [u.loc for u in Sitemap.iter_tree(tmp_path / "sitemap-index.xml")] == urls
+
+    by_size = sitemap.write_shards(
+        tmp_path / "by-size", "https://www.example.com", max_bytes=1000, compress=False
+    )
+    assert len(by_size) > 1
+    for entry in by_size:
+        assert (
+            tmp_path / "by-size" / entry.loc.rsplit("/", 1)[-1]
+        ).stat().st_size <= 1000
+
+
+def test_write_to_file_like(tmp_path, url_text):
+    """Test writing plain and compressed output to binary file-like objects"""
+    sitemap = Sitemap.from_list([url_text])
+    output_file = tmp_path / "sitemap.xml"
+    sitemap.write_to_file(str(output_file))
+
+    plain = io.BytesIO()
+    sitemap.write_to_file(plain)
+    assert plain.getvalue() == output_file.read_bytes()
+
+    compressed = io.BytesIO()
+    sitemap.write_compressed(compressed)
+    assert not compressed.closed
+    assert gzip.decompress(compressed.getvalue()) == output_file.read_bytes()
+
+
+def test_to_bytes_and_iter_chunks(tmp_path, news_entry):
+    """Test in-memory serialization matches the file output"""
+    sitemap = Sitemap.from_list([f"https://www.example.com/{i}/" for i in range(200)])
+    sitemap.urls[0].add_image("https://www.example.com/cat.png")
+    sitemap.urls[1].add_news_entry(news_entry)
+    sitemap.urls[2].add_alternate(hreflang="de", href="https://www.example.de/")
+    output_file = tmp_path / "sitemap.xml"
+    sitemap.write_to_file(str(output_file))
+
+    assert sitemap.to_bytes() == output_file.read_bytes()
+    assert gzip.decompress(sitemap.to_bytes(compress=True)) == output_file.read_bytes()
+
+    chunks = list(sitemap.iter_chunks(chunk_size=1000))
+    assert all(len(c) == 1000 for c in chunks[:-1])
+    assert 0 < len(chunks[-1]) <= 1000
+    assert b"".join(chunks) == output_file.read_bytes()
+
+    compressed_chunks = list(sitemap.iter_chunks(chunk_size=100, compress=True))
+    assert all(len(c) == 100 for c in compressed_chunks[:-1])
+    assert gzip.decompress(b"".join(compressed_chunks)) == output_file.read_bytes()
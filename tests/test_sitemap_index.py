@@ -1,3 +1,5 @@
+import gzip
+import io
 import xml.etree.ElementTree as ET
 
 from pytest import fixture
@@ -88,3 +90,18 @@ def test_write_to_file_with_metadata(tmp_path):
     lastmod = index_element.find("{http://www.sitemaps.org/schemas/sitemap/0.9}lastmod")
 
     assert lastmod.text == "2025-12-01"
+
+
+def test_to_bytes_and_file_like(tmp_path):
+    """Test in-memory serialization matches the file output"""
+    index = SitemapIndex.from_list(["https://example.com/sitemap-1.xml"])
+    index.add_sitemap("https://example.com/sitemap-2.xml", lastmod="2025-12-01")
+    output_file = tmp_path / "output.xml"
+    index.write_to_file(str(output_file))
+
+    buffer = io.BytesIO()
+    index.write_to_file(buffer)
+    assert buffer.getvalue() == output_file.read_bytes()
+    assert index.to_bytes() == output_file.read_bytes()
+    assert gzip.decompress(index.to_bytes(compress=True)) == output_file.read_bytes()
+    assert b"".join(index.iter_chunks(chunk_size=7)) == output_file.read_bytes()
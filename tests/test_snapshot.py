@@ -0,0 +1,157 @@
+from pytest import fixture, raises
+
+from sitemapy import HreflangCluster, NewsEntry, Sitemap, URLEntry
+from sitemapy.snapshot import save_snapshot
+
+
+@fixture
+def sitemap():
+    sitemap = Sitemap()
+    sitemap.add_url(
+        "https://www.example.com/",
+        lastmod="2024-01-15",
+        changefreq="daily",
+        priority=0.8,
+    )
+    sitemap.add_url(
+        "https://www.example.com/ünïcode/",
+        lastmod="2024-01-15T10:30:00+00:00",
+        changefreq="custom",
+        priority=0.12345,
+    )
+    sitemap.add_url("https://www.example.com/bare/", lastmod="2024-02-30")
+
+    entry = URLEntry("https://www.example.com/images/")
+    entry.add_image("https://www.example.com/a.png")
+    entry.add_image("https://www.example.com/b.png")
+    entry.add_alternate(hreflang="de", href="https://www.example.com/de/images/")
+    sitemap.urls.append(entry)
+
+    news = URLEntry("https://www.example.com/news/")
+    news.add_news_entry(NewsEntry(publication_name="Example", title="Title"))
+    sitemap.urls.append(news)
+
+    sitemap.add_hreflang_cluster(
+        HreflangCluster.from_dict(
+            {"en": "https://www.example.com/en/", "fr": "https://www.example.com/fr/"}
+        ),
+        priority=1.0,
+    )
+
+    return sitemap
+
+
+def test_snapshot_round_trip(tmp_path, sitemap):
+    path = tmp_path / "sitemap.snapshot"
+    sitemap.save_snapshot(path)
+    loaded = Sitemap.load_snapshot(path)
+
+    assert len(loaded) == len(sitemap)
+    assert loaded.to_bytes() == sitemap.to_bytes()
+
+    first, second, bare = loaded.urls[0], loaded.urls[1], loaded.urls[2]
+    assert (first.lastmod, first.changefreq, first.priority) == (
+        "2024-01-15",
+        "daily",
+        0.8,
+    )
+    assert second.loc == "https://www.example.com/ünïcode/"
+    assert second.priority == 0.12345
+    assert bare.lastmod == "2024-02-30"
+    assert bare.priority is None
+
+    news = loaded.urls[4].news_entry
+    assert (news.publication_name, news.publication_language, news.title) == (
+        "Example",
+        None,
+        "Title",
+    )
+
+
+def test_snapshot_shares_clusters(tmp_path, sitemap):
+    path = tmp_path / "sitemap.snapshot"
+    sitemap.save_snapshot(path)
+    loaded = Sitemap.load_snapshot(path)
+
+    en, fr = loaded.urls[-2], loaded.urls[-1]
+    assert en.hreflang_cluster is fr.hreflang_cluster
+    assert [a.href for a in en.hreflang_cluster] == [
+        "https://www.example.com/en/",
+        "https://www.example.com/fr/",
+    ]
+
+
+def test_snapshot_decodes_lazily(tmp_path, sitemap):
+    path = tmp_path / "sitemap.snapshot"
+    sitemap.save_snapshot(path)
+    loaded = Sitemap.load_snapshot(path)
+
+    assert loaded.urls[-1].loc == "https://www.example.com/fr/"
+    assert sum(e is not None for e in loaded.urls._decoded) == 1
+
+    # Decoded entries are kept, so edits stick
+    loaded.urls[0].lastmod = "2025-01-01"
+    assert loaded.urls[0].lastmod == "2025-01-01"
+    assert [u.loc for u in loaded.urls[1:3]] == [u.loc for u in sitemap.urls[1:3]]
+
+
+def test_snapshot_mutation(tmp_path, sitemap):
+    path = tmp_path / "sitemap.snapshot"
+    sitemap.save_snapshot(path)
+    loaded = Sitemap.load_snapshot(path)
+
+    loaded.add_url("https://www.example.com/new/")
+    loaded.sort(key="loc")
+    loaded.remove_url("https://www.example.com/")
+
+    assert len(loaded) == len(sitemap)
+    assert loaded.urls[0].loc == "https://www.example.com/bare/"
+
+
+def test_iter_snapshot(tmp_path, sitemap):
+    path = tmp_path / "sitemap.snapshot"
+    assert save_snapshot(iter(sitemap), path) == len(sitemap)
+
+    assert [u.loc for u in Sitemap.iter_snapshot(path)] == [u.loc for u in sitemap]
+
+
+def test_empty_snapshot(tmp_path):
+    path = tmp_path / "sitemap.snapshot"
+    Sitemap().save_snapshot(path)
+
+    assert len(Sitemap.load_snapshot(path)) == 0
+
+
+def test_invalid_snapshot(tmp_path, sitemap):
+    path = tmp_path / "sitemap.snapshot"
+    path.write_bytes(b"")
+    with raises(ValueError):
+        Sitemap.load_snapshot(path)
+
+    path.write_bytes(b"<?xml version='1.0'?>" + bytes(100))
+    with raises(ValueError):
+        Sitemap.load_snapshot(path)
+
+    sitemap.save_snapshot(path)
+    data = bytearray(path.read_bytes())
+    data[4] = 99
+    path.write_bytes(bytes(data))
+    with raises(ValueError, match="version"):
+        Sitemap.load_snapshot(path)
+
+
+def test_snapshot_save_over_loaded_file(tmp_path, sitemap):
+    path = tmp_path / "sitemap.snapshot"
+    sitemap.save_snapshot(path)
+
+    loaded = Sitemap.load_snapshot(path)
+    loaded.urls[0].lastmod = "2025-01-01"
+    loaded.save_snapshot(path)
+
+    # The lazily loaded entries still decode from the old mapping
+    assert loaded.urls[-1].loc == "https://www.example.com/fr/"
+
+    reloaded = Sitemap.load_snapshot(path)
+    assert reloaded.urls[0].lastmod == "2025-01-01"
+    assert reloaded.to_bytes() == loaded.to_bytes()
+    assert [p.name for p in tmp_path.iterdir()] == ["sitemap.snapshot"]
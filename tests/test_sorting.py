@@ -0,0 +1,127 @@
+import random
+
+from pytest import fixture, raises
+
+from sitemapy import (
+    HreflangCluster,
+    ShardedSitemapWriter,
+    Sitemap,
+    URLEntry,
+    sort_entries,
+)
+import sitemapy.sorting as sorting
+
+
+@fixture
+def entries():
+    rng = random.Random(7)
+    entries = [
+        URLEntry(
+            f"https://www.example.com/page-{i:04d}/",
+            lastmod=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            priority=rng.choice([None, 0.1, 0.5, 0.9]),
+        )
+        for i in range(500)
+    ]
+    rng.shuffle(entries)
+    return entries
+
+
+def test_sort_in_memory(entries):
+    result = list(sort_entries(entries))
+
+    assert [e.loc for e in result] == sorted(e.loc for e in entries)
+    assert result[0] in entries
+
+
+def test_sort_spills_runs(tmp_path, entries):
+    result = list(
+        sort_entries(
+            entries, key="lastmod", reverse=True, run_size=64, tmp_dir=tmp_path
+        )
+    )
+
+    assert [e.lastmod for e in result] == sorted(
+        (e.lastmod for e in entries), reverse=True
+    )
+    # Run files are anonymous and gone once the merge finishes
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sort_is_stable(entries):
+    expected = sorted(entries, key=lambda e: e.lastmod[:7])
+    result = list(sort_entries(entries, key=lambda e: e.lastmod[:7], run_size=50))
+
+    assert [e.loc for e in result] == [e.loc for e in expected]
+
+
+def test_sort_merges_many_runs(monkeypatch, entries):
+    monkeypatch.setattr(sorting, "MAX_OPEN_RUNS", 3)
+    result = list(sort_entries(entries, key="priority", run_size=20))
+
+    priorities = [-1.0 if e.priority is None else e.priority for e in result]
+    assert priorities == sorted(priorities)
+    assert len(result) == len(entries)
+
+
+def test_sort_merges_runs_by_level(monkeypatch, entries):
+    monkeypatch.setattr(sorting, "MAX_OPEN_RUNS", 3)
+    written = []
+    write_run = sorting._write_run
+
+    def counting_write_run(url_entries, clusters, tmp_dir):
+        counted = list(url_entries)
+        written.append(len(counted))
+        return write_run(counted, clusters, tmp_dir)
+
+    monkeypatch.setattr(sorting, "_write_run", counting_write_run)
+    result = list(sort_entries(entries, key="priority", run_size=5))
+
+    # Stable, like sorted()
+    expected = sorted(entries, key=sorting.SORT_KEYS["priority"])
+    assert [e.loc for e in result] == [e.loc for e in expected]
+    # 100 runs merged three at a time: each entry is written once per level,
+    # not once per merge
+    assert sum(written) <= len(entries) * 7
+
+
+def test_sort_keeps_shared_clusters():
+    cluster = HreflangCluster.from_dict(
+        {"en": "https://www.example.com/en/", "de": "https://www.example.com/de/"}
+    )
+    entries = cluster.to_url_entries() + [URLEntry("https://www.example.com/a/")]
+
+    result = list(sort_entries(reversed(entries), run_size=1))
+
+    assert [e.loc for e in result] == [
+        "https://www.example.com/a/",
+        "https://www.example.com/de/",
+        "https://www.example.com/en/",
+    ]
+    assert result[1].hreflang_cluster is cluster
+    assert result[2].hreflang_cluster is cluster
+
+
+def test_sort_strings_and_unknown_key():
+    result = list(sort_entries(["https://b.com/", "https://a.com/"]))
+    assert [e.loc for e in result] == ["https://a.com/", "https://b.com/"]
+
+    with raises(ValueError):
+        list(sort_entries([], key="missing"))
+
+
+def test_sorted_shards(tmp_path, entries):
+    with ShardedSitemapWriter(
+        tmp_path, "https://www.example.com/", max_urls=100
+    ) as writer:
+        writer.write_many(sort_entries(entries, key="loc", run_size=64))
+
+    first = list(Sitemap.iter_file(tmp_path / "sitemap-1.xml.gz"))
+    assert first[0].loc == "https://www.example.com/page-0000/"
+    assert first[-1].loc == "https://www.example.com/page-0099/"
+
+
+def test_sitemap_sort(entries):
+    sitemap = Sitemap.from_list(entries).sort(key="lastmod", reverse=True)
+
+    assert sitemap.urls[0].lastmod == max(e.lastmod for e in entries)
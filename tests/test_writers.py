@@ -0,0 +1,99 @@
+import gzip
+import io
+
+from pytest import fixture, raises
+
+from sitemapy import Sitemap, SitemapWriter, ShardedSitemapWriter
+
+
+class UploadBuffer(io.BytesIO):
+    """BytesIO that keeps its content after close, like an upload stream"""
+
+    def __init__(self, store, name):
+        super().__init__()
+        self.store = store
+        self.name_ = name
+
+    def close(self):
+        self.store[self.name_] = self.getvalue()
+        super().close()
+
+
+@fixture
+def urls():
+    return [f"https://www.example.com/page-{i}/" for i in range(25)]
+
+
+def test_sitemap_writer_file_like(urls):
+    buffer = io.BytesIO()
+    with SitemapWriter(buffer, compress=True) as writer:
+        writer.write_many(urls)
+
+    assert not buffer.closed
+    assert writer.url_count == 25
+    assert gzip.decompress(buffer.getvalue()).endswith(b"</urlset>")
+
+
+def test_sitemap_writer_matches_to_bytes(tmp_path, urls):
+    sitemap = Sitemap.from_list(urls)
+    output_file = tmp_path / "sitemap.xml"
+    with SitemapWriter(output_file, namespaces={}) as writer:
+        writer.write_many(sitemap)
+
+    assert output_file.read_bytes() == sitemap.to_bytes()
+
+
+def test_sitemap_writer_failure_keeps_previous_file(tmp_path, urls):
+    output_file = tmp_path / "sitemap.xml.gz"
+    with SitemapWriter(output_file) as writer:
+        writer.write_many(urls)
+    previous = output_file.read_bytes()
+
+    with raises(RuntimeError):
+        with SitemapWriter(output_file) as writer:
+            writer.write_many(urls[:3])
+            raise RuntimeError("job died")
+
+    assert output_file.read_bytes() == previous
+    assert [p.name for p in tmp_path.iterdir()] == ["sitemap.xml.gz"]
+
+
+def test_sharded_writer_opener(urls):
+    store = {}
+    with ShardedSitemapWriter(
+        None,
+        "https://www.example.com/",
+        max_urls=10,
+        opener=lambda name: UploadBuffer(store, name),
+    ) as writer:
+        writer.write_many(urls)
+
+    assert sorted(store) == [
+        "sitemap-1.xml.gz",
+        "sitemap-2.xml.gz",
+        "sitemap-3.xml.gz",
+        "sitemap-index.xml",
+    ]
+    assert b"sitemap-3.xml.gz" in store["sitemap-index.xml"]
+    assert gzip.decompress(store["sitemap-3.xml.gz"]).count(b"<url>") == 5
+
+
+def test_sharded_writer_opener_with_workers(urls):
+    store = {}
+    with ShardedSitemapWriter(
+        None,
+        "https://www.example.com/",
+        max_urls=10,
+        compress=False,
+        workers=2,
+        opener=lambda name: UploadBuffer(store, name),
+    ) as writer:
+        writer.write_many(urls)
+
+    assert store["sitemap-1.xml"].count(b"<url>") == 10
+    assert store["sitemap-3.xml"].count(b"<url>") == 5
+
+
+def test_sharded_writer_requires_destination():
+    with raises(ValueError):
+        ShardedSitemapWriter(None, "https://www.example.com/")